@@ -40,8 +40,8 @@ def validate_excel_config():
         errors.append(f"Extensión de archivo de Excel inválida: {EXCEL_FILE}. Se esperaba .xlsx, .xlsb, o .xlsm")
     
     # Verificar si el archivo existe
-    excel_file_path = os.path.join(EXCEL_PATH, EXCEL_FILE)
-    if not os.path.exists(excel_file_path):
+    excel_file_path = Path(EXCEL_PATH) / EXCEL_FILE
+    if not excel_file_path.is_file():
         errors.append(f"Archivo de Excel no encontrado: {excel_file_path}")
     
     # Verificar que los nombres de las hojas no estén vacíos
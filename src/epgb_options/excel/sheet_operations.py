@@ -5,23 +5,77 @@ Este módulo maneja lectura y escritura en hojas de Excel,
 incluyendo actualizaciones de datos y formato.
 """
 
-from typing import Any, Dict, List, Optional, Union
+import logging
+import re
+import sys
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 
+import numpy as np
 import pandas as pd
 import xlwings as xw
 
-from ..utils.helpers import (clean_dataframe_for_excel,
+from ..utils.helpers import (MARKET_DATA_FIELDS, clean_dataframe_for_excel,
                              clean_symbol_for_display, get_excel_safe_value,
-                             restore_symbol_prefix)
+                             get_excel_safe_values, restore_symbol_prefix)
 from ..utils.logging import get_logger
 from ..utils.validation import validate_pandas_dataframe
 
 logger = get_logger(__name__)
 
+# En Windows los bloques ya saneados se asignan directo por COM (Range.raw_value),
+# salteando la conversión celda por celda de xlwings
+_RAW_COM_WRITES = sys.platform == 'win32'
+
+def _to_com_time(value: Any) -> Any:
+    """
+    Preparar una fecha para asignarla por COM sin los conversores de xlwings.
+    
+    pywin32 rechaza datetime.date y convierte a UTC los datetime sin zona horaria,
+    corriendo la hora por el desfase local. Igual que xlwings (_datetime_to_com_time):
+    se descarta la zona y se marca como UTC, así Excel recibe la hora tal cual.
+    
+    Args:
+        value: Valor de la celda
+        
+    Returns:
+        Any: El datetime marcado como UTC, o el valor sin cambios si no es una fecha
+    """
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).replace(tzinfo=timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    return value
+
+
+# Marca de celda nunca escrita en la tabla de hashes de la hoja Prices (0 no sirve: es el hash del valor 0)
+_UNWRITTEN_HASH = np.uint64(2**64 - 1)
+
+# Símbolo de caución ("MERV - XMEV - PESOS - 3D"), capturando la cantidad de días
+_CAUCION_PATTERN = re.compile(r' - PESOS - (\d+)D$')
+
 
 class SheetOperations:
     """Maneja operaciones de hojas de Excel para lectura y escritura de datos."""
     
+    # Campos de la hoja Prices en orden de columna: B=bid_size ... O=datetime (A=symbol)
+    PRICES_FIELDS = MARKET_DATA_FIELDS
+    
+    # Letra de columna de cada campo de PRICES_FIELDS (B..O)
+    PRICES_COLUMNS = tuple(chr(ord('B') + offset) for offset in range(len(PRICES_FIELDS)))
+    
+    # Fila de la tabla de cauciones para cada plazo (e.g. "3D"): la fila 2 es 1D, la 3 es 2D, etc.
+    # (1-60 días); caso especial: 60 días está en la fila 34
+    CAUCION_PERIOD_ROWS = {**{f"{days}D": days + 1 for days in range(1, 61)}, "60D": 34}
+    
+    # Filas sin cambios entre dos filas modificadas que se reescriben igual para no cortar el rango
+    # (cada rango escrito es una llamada COM)
+    DIFF_WRITE_MAX_GAP = 16
+    
+    # El resumen de cada volcado se registra en INFO sólo una vez cada tantos volcados (el resto en DEBUG)
+    SUMMARY_LOG_EVERY = 20
+    
     def __init__(self, workbook: xw.Book, instrument_cache=None):
         """
         Inicializar operaciones de hojas.
@@ -37,6 +91,98 @@ class SheetOperations:
             'errors': 0,
             'last_update_time': None
         }
+        
+        # Cached xlwings handles (each resolution is a COM round-trip)
+        self._sheet_cache: Dict[str, xw.Sheet] = {}
+        self._range_cache: Dict[Tuple[int, str], xw.Range] = {}
+        
+        # Symbol -> Prices sheet row, read from column A on the first bulk write
+        self._symbol_row_cache: Optional[Dict[str, int]] = None
+        # Same mapping as parallel arrays for vectorized lookups (rebuilt when the dict grows)
+        self._symbol_index: Optional[pd.Index] = None
+        self._row_array = np.zeros(0, dtype=np.int64)
+        
+        # Hash of each cell last written to the Prices sheet: one row per sheet row, one column
+        # per PRICES_FIELDS entry (_UNWRITTEN_HASH = never written)
+        self._prices_cell_hashes = self._empty_prices_hashes()
+        
+        # Sheets whose header row was already checked (or written) in this session
+        self._headers_verified: Set[str] = set()
+        
+        # xlwings App handle, resolved on first bulk write
+        self._app = None
+        
+        # Caucion maturity dates, preallocated once per calendar day
+        self._vencimientos = None
+        self._vencimientos_date = None
+    
+    @contextmanager
+    def _excel_updates_suspended(self) -> Iterator[None]:
+        """
+        Desactivar el repintado de pantalla y el cálculo automático de Excel
+        mientras dura el bloque, restaurando después los valores previos.
+        
+        Cada escritura dispara un repintado y un recálculo de las fórmulas que
+        dependen de los precios; así Excel recalcula una sola vez al final.
+        Los eventos (Worksheet_Change) quedan activos: las macros del libro que
+        reaccionan a los precios deben seguir viendo cada escritura.
+        """
+        app = self._app
+        if app is None:
+            app = self._app = getattr(self.workbook, 'app', None)
+        
+        previous = None
+        if app is not None:
+            try:
+                previous = (app.screen_updating, app.calculation)
+                app.screen_updating = False
+                app.calculation = 'manual'
+            except Exception as e:
+                logger.debug(f"No se pudo suspender el recálculo de Excel: {e}")
+        
+        try:
+            yield
+        finally:
+            if previous is not None:
+                try:
+                    app.calculation = previous[1]
+                    app.screen_updating = previous[0]
+                except Exception as e:
+                    logger.warning(f"No se pudo restaurar el recálculo de Excel: {e}")
+    
+    def _get_sheet(self, sheet_name: str) -> xw.Sheet:
+        """
+        Obtener una hoja del libro, resolviéndola por COM sólo la primera vez.
+        
+        Args:
+            sheet_name: Nombre de la hoja
+            
+        Returns:
+            xw.Sheet: Objeto Sheet de xlwings
+        """
+        sheet = self._sheet_cache.get(sheet_name)
+        if sheet is None:
+            sheet = self.workbook.sheets(sheet_name)
+            self._sheet_cache[sheet_name] = sheet
+        return sheet
+    
+    def _get_range(self, sheet: xw.Sheet, range_address: str) -> xw.Range:
+        """
+        Obtener un rango de la hoja, reutilizando el objeto Range ya resuelto.
+        
+        Args:
+            sheet: Objeto Sheet de xlwings (obtenido con _get_sheet)
+            range_address: Dirección del rango de Excel
+            
+        Returns:
+            xw.Range: Objeto Range de xlwings
+        """
+        key = (id(sheet), range_address)
+        rng = self._range_cache.get(key)
+        if rng is None:
+            rng = sheet.range(range_address)
+            self._range_cache[key] = rng
+        return rng
     
     def set_instrument_cache(self, instrument_cache):
         """
@@ -48,20 +194,26 @@ class SheetOperations:
         self.instrument_cache = instrument_cache
         logger.debug("Caché de instrumentos configurado para detección de opciones")
     
-    def read_range(self, sheet_name: str, range_address: str) -> Any:
+    def read_range(self, sheet_name: str, range_address: str,
+                   as_array: bool = False, dtype: Any = None) -> Any:
         """
         Leer datos de un rango de Excel.
         
         Args:
             sheet_name: Nombre de la hoja
             range_address: Dirección del rango de Excel (ej., 'A1:C10')
+            as_array: Si es True, devolver un np.ndarray 2D en lugar de listas anidadas
+            dtype: Tipo de dato del array (sólo con as_array; None lo infiere numpy)
             
         Returns:
             Any: Datos del rango
         """
         try:
-            sheet = self.workbook.sheets(sheet_name)
-            data = sheet.range(range_address).value
+            sheet = self._get_sheet(sheet_name)
+            if as_array:
+                data = sheet.range(range_address).options(np.array, ndim=2, dtype=dtype).value
+            else:
+                data = sheet.range(range_address).value
             logger.debug(f"Datos leídos de {sheet_name}!{range_address}")
             return data
         except Exception as e:
@@ -81,7 +233,7 @@ class SheetOperations:
             bool: True si fue exitoso, False en caso contrario
         """
         try:
-            sheet = self.workbook.sheets(sheet_name)
+            sheet = self._get_sheet(sheet_name)
             sheet.range(range_address).value = data
             logger.debug(f"Datos escritos en {sheet_name}!{range_address}")
             self.update_stats['updates_performed'] += 1
@@ -120,7 +272,7 @@ class SheetOperations:
             clean_df = clean_dataframe_for_excel(df)
             
             # Get sheet
-            sheet = self.workbook.sheets(sheet_name)
+            sheet = self._get_sheet(sheet_name)
             
             # Write DataFrame to sheet
             sheet.range(start_cell).options(pd.DataFrame, 
@@ -152,122 +304,111 @@ class SheetOperations:
             bool: True si fue exitoso, False en caso contrario
         """
         try:
-            if df.empty:
+            if df.empty and (cauciones_df is None or cauciones_df.empty):
                 logger.warning("No hay datos de mercado para actualizar")
                 return True
             
             logger.debug(f"Actualizando datos de mercado en {prices_sheet_name}")
             
+            # Un símbolo repetido apunta a la misma fila de Excel (y a un único hash de fila):
+            # sólo se escribe su última aparición
+            if df.index.has_duplicates:
+                df = df[~df.index.duplicated(keep='last')]
+            
             # DEBUG: Log DataFrame state for first few updates
-            if self.update_stats['updates_performed'] < 2:
-                sample_symbols = df.index[:3].tolist()
-                logger.debug(f"Muestra de DataFrame (primeros 3 símbolos): {sample_symbols}")
-                for sym in sample_symbols:
-                    logger.debug(f"  {sym}: bid={df.loc[sym, 'bid']}, ask={df.loc[sym, 'ask']}, last={df.loc[sym, 'last']}")
-            
-            # Get Prices sheet
-            prices_sheet = self.workbook.sheets(prices_sheet_name)
-            
-            # Build symbol-to-row mapping ONCE (cache for performance)
-            if not hasattr(self, '_symbol_row_cache') or self.update_stats['updates_performed'] == 0:
-                # Ensure headers exist in row 1
-                self._ensure_headers_exist(prices_sheet)
-                
-                # Read existing symbols from column A (skip header row)
-                symbols_range = prices_sheet.range('A2:A1000')  # Read up to 1000 rows
-                symbols = symbols_range.value
-                
-                # Handle case where only one symbol exists (xlwings returns single value instead of list)
-                if not isinstance(symbols, list):
-                    symbols = [symbols] if symbols else []
+            if self.update_stats['updates_performed'] < 2 and logger.isEnabledFor(logging.DEBUG):
+                sample = df.head(3).reindex(columns=['bid', 'ask', 'last']).to_dict('index')
+                logger.debug(f"Muestra de DataFrame (primeros 3 símbolos): {list(sample)}")
+                for sym, prices in sample.items():
+                    logger.debug(f"  {sym}: bid={prices['bid']}, ask={prices['ask']}, last={prices['last']}")
+            
+            # Suspend screen updating and recalculation during the bulk writes
+            with self._excel_updates_suspended():
+                # Get Prices sheet
+                prices_sheet = self._get_sheet(prices_sheet_name)
+            
+                # Build symbol-to-row mapping ONCE (cache for performance; see invalidate_symbol_cache)
+                if self._symbol_row_cache is None:
+                    # Ensure headers exist in row 1
+                    self._ensure_headers_exist(prices_sheet)
+                    self._build_symbol_row_cache(prices_sheet)
+            
+                # Always check for missing symbols (not just on first call)
+                # This ensures options (or any new symbols) added later are also populated
+                row_numbers = self._lookup_symbol_rows(df.index)
+                if not row_numbers.all():
+                    missing_symbols = df.index[row_numbers == 0].tolist()
+                    logger.info(f"Auto-poblando {len(missing_symbols)} símbolos nuevos en la hoja Prices...")
+                    self._add_symbols_to_sheet(prices_sheet, missing_symbols)
+                    logger.info(f"✅ Agregados {len(missing_symbols)} símbolos nuevos a Excel")
+                    row_numbers = self._lookup_symbol_rows(df.index)
+            
+                # DIFF UPDATE: hash each cell (columns B:O, see PRICES_FIELDS) and write only
+                # the rows that changed since the last write, one 2-D block per run, trimmed to
+                # the columns that changed in that run
+                field_order = self.PRICES_FIELDS
+                in_sheet = row_numbers > 0
+                if in_sheet.any():
+                    # Missing fields are written as 0; values are sanitized column-wise in one pass
+                    frame = df.reindex(columns=field_order, fill_value=0)
+                    order = np.argsort(row_numbers[in_sheet], kind='stable')
+                    rows = row_numbers[in_sheet][order]
+                    values = get_excel_safe_values(frame)[in_sheet][order]
+                    hashes = np.column_stack([
+                        pd.util.hash_pandas_object(column, index=False).to_numpy()
+                        for _, column in frame.items()
+                    ])[in_sheet][order]
                 
-                self._symbol_row_cache = {}
-                duplicate_rows = []  # Track rows with duplicate symbols
+                    last_hashes = self._prices_cell_hashes
+                    if len(last_hashes) <= rows[-1]:
+                        last_hashes = np.full((int(rows[-1]) + 1, len(field_order)), _UNWRITTEN_HASH, dtype=np.uint64)
+                        last_hashes[:len(self._prices_cell_hashes)] = self._prices_cell_hashes
+                        self._prices_cell_hashes = last_hashes
+                    changed_cells = hashes != last_hashes[rows]
+                    changed = np.flatnonzero(changed_cells.any(axis=1))
                 
-                for idx, cell_value in enumerate(symbols):
-                    if cell_value and str(cell_value).strip():
-                        # Row index is idx + 2 (skip header at row 1, and enumerate starts at 0)
-                        # Cell contains cleaned symbol (e.g., "GGAL - 24hs" or "GFGC73354O")
-                        display_symbol = str(cell_value).strip()
-                        
-                        # Restore prefix first
-                        full_symbol = restore_symbol_prefix(display_symbol)
+                    if changed.size:
+                        if _RAW_COM_WRITES:
+                            # raw_value skips xlwings' datetime conversion: do it for the rows to write
+                            datetime_column = field_order.index('datetime')
+                            values[changed, datetime_column] = [
+                                _to_com_time(value) for value in values[changed, datetime_column]
+                            ]
                         
-                        # Check if symbol already has a suffix (e.g., " - 24hs", " - 48hs", etc.)
-                        has_suffix = any(full_symbol.endswith(suffix) for suffix in 
-                                       [" - 24hs", " - 48hs", " - 72hs", " - CI", " - T0", " - T1", " - T2"])
-                        
-                        # If no suffix present and not a caucion (PESOS - XD), add " - 24hs"
-                        # This handles options that had their suffix stripped for display
-                        if not has_suffix and "PESOS" not in full_symbol:
-                            full_symbol = f"{full_symbol} - 24hs"
-                        
-                        # Check for duplicates
-                        if full_symbol in self._symbol_row_cache:
-                            duplicate_rows.append(idx + 2)
-                            logger.warning(f"Símbolo duplicado detectado: {display_symbol} en fila {idx + 2} (ya existe en fila {self._symbol_row_cache[full_symbol]})")
-                        else:
-                            self._symbol_row_cache[full_symbol] = idx + 2
-                
-                logger.info(f"Caché de filas de símbolos construido con {len(self._symbol_row_cache)} símbolos desde Excel")
-                
-                # If duplicates found, clean them up
-                if duplicate_rows:
-                    logger.warning(f"Encontradas {len(duplicate_rows)} símbolos duplicados en la hoja de Excel")
-                    self._remove_duplicate_rows(prices_sheet, duplicate_rows)
-                    logger.info(f"✅ Eliminadas {len(duplicate_rows)} filas duplicadas de Excel")
-            
-            # Always check for missing symbols (not just on first call)
-            # This ensures options (or any new symbols) added later are also populated
-            missing_symbols = [sym for sym in df.index if sym not in self._symbol_row_cache]
-            if missing_symbols:
-                logger.info(f"Auto-poblando {len(missing_symbols)} símbolos nuevos en la hoja Prices...")
-                self._add_symbols_to_sheet(prices_sheet, missing_symbols)
-                logger.info(f"✅ Agregados {len(missing_symbols)} símbolos nuevos a Excel")
-            
-            # BULK UPDATE: Build 2D array for all data at once
-            # Columns: B=bid_size, C=bid, D=ask, E=ask_size, F=last, G=change, H=open, I=high, J=low, K=previous_close, L=turnover, M=volume, N=operations, O=datetime
-            field_order = ['bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 
-                          'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime']
-            
-            # Collect updates by row number
-            updates_by_row = {}
-            for symbol, row_data in df.iterrows():
-                row_index = self._symbol_row_cache.get(symbol)
-                if row_index:
-                    # Build row values
-                    row_values = []
-                    for field in field_order:
-                        if field in row_data:
-                            row_values.append(get_excel_safe_value(row_data[field]))
-                        else:
-                            row_values.append(0)
-                    updates_by_row[row_index] = row_values
-            
-            # Find contiguous ranges for even faster bulk updates
-            sorted_rows = sorted(updates_by_row.keys())
-            if sorted_rows:
-                min_row = sorted_rows[0]
-                max_row = sorted_rows[-1]
-                
-                # Build 2D array with all rows (including gaps filled with existing data)
-                bulk_data = []
-                for row_idx in range(min_row, max_row + 1):
-                    if row_idx in updates_by_row:
-                        bulk_data.append(updates_by_row[row_idx])
-                    else:
-                        # Keep existing data for rows not in DataFrame (fill with None to skip update)
-                        bulk_data.append([None] * len(field_order))
-                
-                # Single bulk write: Write entire range B{min}:O{max} at once
-                range_address = f'B{min_row}:O{max_row}'
-                prices_sheet.range(range_address).value = bulk_data
-                
-                logger.info(f"✅ Actualización masiva de {len(updates_by_row)} instrumentos en el rango {range_address}")
+                        # Runs of changed rows: break where the sheet rows are not contiguous (a row
+                        # outside the DataFrame must not be overwritten) or the unchanged gap is long
+                        position_steps = np.diff(changed)
+                        row_steps = np.diff(rows[changed])
+                        breaks = np.flatnonzero(
+                            (row_steps != position_steps) | (position_steps > self.DIFF_WRITE_MAX_GAP)
+                        ) + 1
+                        for run in np.split(changed, breaks):
+                            start, end = run[0], run[-1]
+                            # Steady-state ticks only move a few fields (bid/ask/last/datetime):
+                            # skip the leading and trailing columns that did not change in this run
+                            changed_columns = np.flatnonzero(changed_cells[start:end + 1].any(axis=0))
+                            first, last = changed_columns[0], changed_columns[-1]
+                            range_address = (f'{self.PRICES_COLUMNS[first]}{rows[start]}:'
+                                             f'{self.PRICES_COLUMNS[last]}{rows[end]}')
+                            block = values[start:end + 1, first:last + 1]
+                            # Only the full block is cached; partial runs change address every cycle
+                            if start == 0 and end == len(rows) - 1 and first == 0 and last == len(field_order) - 1:
+                                rng = self._get_range(prices_sheet, range_address)
+                            else:
+                                rng = prices_sheet.range(range_address)
+                            if _RAW_COM_WRITES:
+                                rng.raw_value = block.tolist()
+                            else:
+                                rng.value = block
+                    
+                        last_hashes[rows] = hashes
+                        summary_level = logging.INFO if self.update_stats['updates_performed'] % self.SUMMARY_LOG_EVERY == 0 else logging.DEBUG
+                        logger.log(summary_level, "✅ Actualizados %d de %d instrumentos en %d rangos",
+                                   changed.size, len(rows), len(breaks) + 1)
             
-            # Update cauciones table on the right side (columns R-U) using separate DataFrame
-            if cauciones_df is not None and not cauciones_df.empty:
-                self._update_cauciones_table(prices_sheet, cauciones_df)
+                # Update cauciones table on the right side (columns R-U) using separate DataFrame
+                if cauciones_df is not None and not cauciones_df.empty:
+                    self._update_cauciones_table(prices_sheet, cauciones_df)
             
             self.update_stats['updates_performed'] += 1
             return True
@@ -275,8 +416,149 @@ class SheetOperations:
         except Exception as e:
             logger.error(f"Error al actualizar datos de mercado en la hoja Prices: {e}")
             self.update_stats['errors'] += 1
+            # A stale handle (sheet renamed or deleted) would fail every retry: resolve it again next time
+            self.invalidate_caches()
             return False
     
+    def _empty_prices_hashes(self) -> np.ndarray:
+        """Tabla de hashes de celdas vacía (sin filas escritas) para la hoja Prices."""
+        return np.zeros((0, len(self.PRICES_FIELDS)), dtype=np.uint64)
+    
+    def invalidate_caches(self):
+        """
+        Descartar los objetos Sheet y Range ya resueltos.
+        
+        Usar si se renombran, borran o reemplazan hojas: la próxima operación los
+        vuelve a resolver por COM. El mapeo símbolo → fila se conserva (ver
+        invalidate_symbol_cache).
+        """
+        self._sheet_cache.clear()
+        self._range_cache.clear()
+    
+    def invalidate_symbol_cache(self):
+        """
+        Descartar el mapeo símbolo → fila de la hoja Prices.
+        
+        Usar después de editar a mano la columna A: el próximo volcado la vuelve
+        a leer y reescribe todas las filas.
+        """
+        self._symbol_row_cache = None
+        self._symbol_index = None
+        self._prices_cell_hashes = self._empty_prices_hashes()
+        self._headers_verified.clear()
+        self._range_cache.clear()
+    
+    def _build_symbol_row_cache(self, sheet: xw.Sheet):
+        """
+        Construir el mapeo símbolo → fila leyendo la columna A de la hoja Prices.
+        
+        Las filas con símbolos duplicados se eliminan de Excel y la columna se
+        vuelve a leer, ya que borrar filas desplaza las de abajo. El mapeo sólo se
+        asigna completo, así un error a mitad de la lectura no deja uno parcial.
+        
+        Args:
+            sheet: Objeto Sheet de xlwings (hoja Prices)
+        """
+        row_cache, duplicate_rows = self._scan_symbol_rows(sheet)
+        
+        # If duplicates found, clean them up
+        if duplicate_rows:
+            logger.warning(f"Encontradas {len(duplicate_rows)} símbolos duplicados en la hoja de Excel")
+            self._remove_duplicate_rows(sheet, duplicate_rows)
+            logger.info(f"✅ Eliminadas {len(duplicate_rows)} filas duplicadas de Excel")
+            row_cache, _ = self._scan_symbol_rows(sheet)
+        
+        self._symbol_row_cache = row_cache
+        self._symbol_index = None
+        self._prices_cell_hashes = self._empty_prices_hashes()
+        logger.info(f"Caché de filas de símbolos construido con {len(row_cache)} símbolos desde Excel")
+    
+    def _lookup_symbol_rows(self, symbols: pd.Index) -> np.ndarray:
+        """
+        Resolver la fila de la hoja Prices de cada símbolo en una sola pasada.
+        
+        Args:
+            symbols: Índice de símbolos (normalmente el índice del DataFrame)
+            
+        Returns:
+            np.ndarray: Número de fila por símbolo (int64), 0 si no está en la hoja
+        """
+        # Symbols are only ever added to the dict, so a size change means it is stale
+        if self._symbol_index is None or len(self._symbol_index) != len(self._symbol_row_cache):
+            self._symbol_index = pd.Index(list(self._symbol_row_cache.keys()))
+            self._row_array = np.fromiter(
+                self._symbol_row_cache.values(), dtype=np.int64, count=len(self._symbol_row_cache)
+            )
+        
+        positions = self._symbol_index.get_indexer(symbols)
+        found = positions >= 0
+        rows = np.zeros(len(symbols), dtype=np.int64)
+        rows[found] = self._row_array[positions[found]]
+        return rows
+    
+    def _scan_symbol_rows(self, sheet: xw.Sheet) -> Tuple[Dict[str, int], List[int]]:
+        """
+        Leer la columna A y mapear cada símbolo (con prefijo y sufijo restaurados) a su fila.
+        
+        Args:
+            sheet: Objeto Sheet de xlwings (hoja Prices)
+            
+        Returns:
+            tuple: (mapeo símbolo → fila, filas con símbolos duplicados)
+        """
+        # Read existing symbols from column A (skip header row)
+        symbols = self._read_symbol_column(sheet)
+        
+        row_cache = {}
+        duplicate_rows = []  # Track rows with duplicate symbols
+        
+        for idx, cell_value in enumerate(symbols):
+            if cell_value and str(cell_value).strip():
+                # Row index is idx + 2 (skip header at row 1, and enumerate starts at 0)
+                # Cell contains cleaned symbol (e.g., "GGAL - 24hs" or "GFGC73354O")
+                display_symbol = str(cell_value).strip()
+                
+                # Restore prefix first
+                full_symbol = restore_symbol_prefix(display_symbol)
+                
+                # Check if symbol already has a suffix (e.g., " - 24hs", " - 48hs", etc.)
+                has_suffix = any(full_symbol.endswith(suffix) for suffix in 
+                               [" - 24hs", " - 48hs", " - 72hs", " - CI", " - T0", " - T1", " - T2"])
+                
+                # If no suffix present and not a caucion (PESOS - XD), add " - 24hs"
+                # This handles options that had their suffix stripped for display
+                if not has_suffix and "PESOS" not in full_symbol:
+                    full_symbol = f"{full_symbol} - 24hs"
+                
+                # Check for duplicates
+                if full_symbol in row_cache:
+                    duplicate_rows.append(idx + 2)
+                    logger.warning(f"Símbolo duplicado detectado: {display_symbol} en fila {idx + 2} (ya existe en fila {row_cache[full_symbol]})")
+                else:
+                    row_cache[full_symbol] = idx + 2
+        
+        return row_cache, duplicate_rows
+    
+    def _read_symbol_column(self, sheet: xw.Sheet) -> list:
+        """
+        Leer la columna A de símbolos (desde la fila 2) hasta el final del rango usado.
+        
+        UsedRange acota la lectura a las filas con datos, sin un tope fijo de filas
+        que trunque universos grandes ni cientos de celdas vacías por COM.
+        
+        Args:
+            sheet: Objeto Sheet de xlwings
+            
+        Returns:
+            list: Valores de la columna A, uno por fila desde la fila 2
+        """
+        last_row = sheet.used_range.last_cell.row
+        if last_row < 2:
+            return []
+        
+        # ndim=1: siempre una lista, incluso si el rango es de una sola celda
+        return sheet.range(f'A2:A{last_row}').options(ndim=1).value
+    
     def _ensure_headers_exist(self, sheet: xw.Sheet):
         """
         Asegurar que la hoja Prices tenga los encabezados apropiados en la fila 1.
@@ -284,24 +566,25 @@ class SheetOperations:
         Args:
             sheet: Objeto Sheet de xlwings
         """
+        if sheet.name in self._headers_verified:
+            return
+        
         try:
-            # Check if headers already exist
-            header_row = sheet.range('A1:O1').value
+            # Check if headers already exist: A1 alone tells an uninitialized sheet apart
+            header_cell = sheet.range('A1').value
             
             # Define expected headers
-            expected_headers = [
-                'symbol', 'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change',
-                'open', 'high', 'low', 'previous_close', 'turnover', 'volume',
-                'operations', 'datetime'
-            ]
+            expected_headers = ['symbol', *self.PRICES_FIELDS]
             
             # If headers don't match, write them
-            if not header_row or header_row[0] != 'symbol':
+            if header_cell != 'symbol':
                 logger.info("Creando encabezados en la hoja Prices...")
                 sheet.range('A1:O1').value = expected_headers
                 # Optional: Format headers (bold)
                 sheet.range('A1:O1').font.bold = True
                 logger.debug("Encabezados creados exitosamente")
+            
+            self._headers_verified.add(sheet.name)
                 
         except Exception as e:
             logger.error(f"Error al asegurar que existan los encabezados: {e}")
@@ -329,6 +612,9 @@ class SheetOperations:
                 # Delete the entire row
                 sheet.range(f'{row_num}:{row_num}').api.Delete()
             
+            # Cached Range objects shift with the deleted rows - drop them
+            self._range_cache.clear()
+            
             logger.debug(f"Eliminadas exitosamente {len(sorted_rows)} filas duplicadas")
             
         except Exception as e:
@@ -346,17 +632,15 @@ class SheetOperations:
         try:
             # Find the last row with data in column A (starting from row 2, since row 1 is header)
             last_row = 1  # Start with header row
-            if hasattr(self, '_symbol_row_cache') and self._symbol_row_cache:
+            if self._symbol_row_cache:
                 last_row = max(self._symbol_row_cache.values())
             else:
-                # Check for existing data starting from row 2
-                existing_symbols = sheet.range('A2:A1000').value
-                if isinstance(existing_symbols, list):
-                    # Count non-empty cells
-                    non_empty = [s for s in existing_symbols if s and str(s).strip()]
-                    last_row = len(non_empty) + 1  # +1 for header
-                elif existing_symbols:
-                    last_row = 2  # One symbol at row 2
+                # Last non-empty cell in column A (row 2 onwards)
+                existing_symbols = self._read_symbol_column(sheet)
+                for idx in range(len(existing_symbols) - 1, -1, -1):
+                    if existing_symbols[idx] and str(existing_symbols[idx]).strip():
+                        last_row = idx + 2
+                        break
             
             # Add symbols starting from the next available row
             start_row = last_row + 1
@@ -419,100 +703,62 @@ class SheetOperations:
             from datetime import datetime, timedelta
 
             # Build mapping from days to pyRofex symbols
-            # Extract only caucion symbols from DataFrame
-            caucion_symbols = [sym for sym in df.index if 'PESOS' in sym and 'D' in sym.split(' - ')[-1]]
+            # Extract only caucion symbols and their days in one vectorized regex pass over the index
+            caucion_days = df.index.astype(str).str.extract(_CAUCION_PATTERN, expand=False)
+            caucion_mask = caucion_days.notna()
+            caucion_symbols = df.index[caucion_mask]
             
-            if not caucion_symbols:
+            if len(caucion_symbols) == 0:
                 return  # No cauciones to update
             
             # Get today's date
             today = datetime.now().date()
             
-            # Mapping from period (e.g., "3D") to row number in cauciones table
-            period_to_row = {}
-            for i in range(1, 61):  # Support 1-60 days
-                period_to_row[f"{i}D"] = i + 1  # Row 2 is 1D, Row 3 is 2D, etc.
-            period_to_row["60D"] = 34  # Special case: 60 días is at row 34
-            
-            # Collect updates for cauciones table
-            updates = []
-            
-            for symbol in caucion_symbols:
-                # Extract period from symbol (e.g., "MERV - XMEV - PESOS - 3D" -> "3D")
-                parts = symbol.split(' - ')
-                if len(parts) >= 4:
-                    period = parts[3]  # e.g., "3D"
-                    
-                    # Get row number for this period
-                    row_num = period_to_row.get(period)
-                    if row_num is None:
-                        continue
-                    
-                    # Extract number of days from period (e.g., "3D" -> 3)
-                    try:
-                        num_days = int(period.rstrip('D'))
-                    except ValueError:
-                        continue
-                    
-                    # Get data for this symbol
-                    if symbol in df.index:
-                        row_data = df.loc[symbol]
-                        
-                        # Calculate vencimiento (maturity date = today + num_days)
-                        vencimiento = today + timedelta(days=num_days)
-                        
-                        # Extract values for cauciones table:
-                        # Column S: Vencimiento (maturity date)
-                        # Column T: Tasa (last price / 100)
-                        # Column U: Monto $ (volume)
-                        # Column V: Monto Tomador (bid_size)
-                        # Column W: Tasa Tomadora (bid / 100)
-                        # Column X: Tasa Colocadora (ask / 100)
-                        # Column Y: Monto Colocador (ask_size)
-                        
-                        tasa_raw = get_excel_safe_value(row_data.get('last', 0))
-                        tasa = tasa_raw / 100 if tasa_raw else 0
-                        
-                        monto = get_excel_safe_value(row_data.get('volume', 0))
-                        monto_tomador = get_excel_safe_value(row_data.get('bid_size', 0))
-                        
-                        tasa_tomadora_raw = get_excel_safe_value(row_data.get('bid', 0))
-                        tasa_tomadora = tasa_tomadora_raw / 100 if tasa_tomadora_raw else 0
-                        
-                        tasa_colocadora_raw = get_excel_safe_value(row_data.get('ask', 0))
-                        tasa_colocadora = tasa_colocadora_raw / 100 if tasa_colocadora_raw else 0
-                        
-                        monto_colocador = get_excel_safe_value(row_data.get('ask_size', 0))
-                        
-                        # Store update: (row, [vencimiento, tasa, monto, monto_tomador, tasa_tomadora, tasa_colocadora, monto_colocador])
-                        updates.append((row_num, [vencimiento, tasa, monto, monto_tomador, tasa_tomadora, tasa_colocadora, monto_colocador]))
-            
-            # Apply updates to Excel using BULK UPDATE for better performance
-            if updates:
-                # Sort by row number
-                updates.sort(key=lambda x: x[0])
-                
-                # Find min and max row numbers
-                min_row = updates[0][0]
-                max_row = updates[-1][0]
-                
-                # Create updates dictionary for quick lookup
-                updates_dict = {row_num: values for row_num, values in updates}
-                
-                # Build 2D array for bulk update (fill gaps with None to preserve existing data)
-                bulk_data = []
-                for row_idx in range(min_row, max_row + 1):
-                    if row_idx in updates_dict:
-                        bulk_data.append(updates_dict[row_idx])
-                    else:
-                        # Fill gaps with None to preserve existing Excel data
-                        bulk_data.append([None] * 7)  # 7 columns: S-Y
-                
-                # Single bulk write for all cauciones
-                range_address = f'S{min_row}:Y{max_row}'
-                sheet.range(range_address).value = bulk_data
-                
-                logger.debug(f"✅ Actualización masiva de {len(updates)} cauciones en el rango {range_address}")
+            # Maturity dates for 1-60 days (index = days - 1), rebuilt only when the date changes
+            if self._vencimientos_date != today:
+                self._vencimientos = pd.date_range(today + timedelta(days=1), periods=60, freq='D').date
+                self._vencimientos_date = today
+            vencimientos = self._vencimientos
+            
+            # Table row for each caucion period (e.g., "MERV - XMEV - PESOS - 3D" -> "3D");
+            # periods without a row in the table are skipped
+            days = caucion_days[caucion_mask]
+            table_rows = np.fromiter(
+                (self.CAUCION_PERIOD_ROWS.get(f"{d}D", 0) for d in days), dtype=np.int64, count=len(days)
+            )
+            in_table = table_rows > 0
+            if not in_table.any():
+                return
+            table_rows = table_rows[in_table]
+            cauciones = df.loc[caucion_mask].loc[in_table]
+            
+            # Assemble the S:Y columns for all cauciones at once (columnar, no per-symbol .loc):
+            # Column S: Vencimiento (maturity date = today + days)
+            # Column T: Tasa (last price / 100)
+            # Column U: Monto $ (volume)
+            # Column V: Monto Tomador (bid_size)
+            # Column W: Tasa Tomadora (bid / 100)
+            # Column X: Tasa Colocadora (ask / 100)
+            # Column Y: Monto Colocador (ask_size)
+            rate_values = cauciones.reindex(columns=['last', 'bid', 'ask'], fill_value=0).to_numpy(dtype=float)
+            rate_values = np.nan_to_num(rate_values, nan=0.0, posinf=0.0, neginf=0.0) / 100
+            values = np.empty((len(table_rows), 7), dtype=object)
+            values[:, 0] = vencimientos[days[in_table].astype(int) - 1]
+            values[:, [1, 4, 5]] = rate_values
+            values[:, [2, 3, 6]] = get_excel_safe_values(
+                cauciones.reindex(columns=['volume', 'bid_size', 'ask_size'], fill_value=0)
+            )
+            
+            # Single bulk write for all cauciones: rows without data in the DataFrame stay None
+            min_row = int(table_rows.min())
+            max_row = int(table_rows.max())
+            bulk_data = np.full((max_row - min_row + 1, 7), None, dtype=object)
+            bulk_data[table_rows - min_row] = values
+            
+            range_address = f'S{min_row}:Y{max_row}'
+            self._get_range(sheet, range_address).value = bulk_data.tolist()
+            
+            logger.debug(f"✅ Actualización masiva de {len(table_rows)} cauciones en el rango {range_address}")
             
         except Exception as e:
             logger.error(f"Error al actualizar la tabla de cauciones: {e}")
@@ -529,7 +775,7 @@ class SheetOperations:
         """
         try:
             # Use cached row mapping instead of searching column A every time
-            if hasattr(self, '_symbol_row_cache'):
+            if self._symbol_row_cache is not None:
                 row_index = self._symbol_row_cache.get(symbol)
             else:
                 # Fallback: search column A (slower)
@@ -545,30 +791,10 @@ class SheetOperations:
                 logger.warning(f"Símbolo '{symbol}' no encontrado en la columna A de la hoja")
                 return
             
-            # Define column mapping (adjust based on your Excel structure)
-            # Assuming: A=symbol, B=bid_size, C=bid, D=ask, E=ask_size, F=last, G=change, etc.
-            column_mapping = {
-                'bid_size': 'B',
-                'bid': 'C',
-                'ask': 'D',
-                'ask_size': 'E',
-                'last': 'F',
-                'change': 'G',
-                'open': 'H',
-                'high': 'I',
-                'low': 'J',
-                'previous_close': 'K',
-                'turnover': 'L',
-                'volume': 'M',
-                'operations': 'N',
-                'datetime': 'O'
-            }
-            
             # Batch update: Prepare all values in one list for faster Excel write
             # Build row data for columns B through O (14 columns)
             row_values = []
-            for field in ['bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open', 
-                         'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime']:
+            for field in self.PRICES_FIELDS:
                 if field in data:
                     row_values.append(get_excel_safe_value(data[field]))
                 else:
@@ -594,7 +820,7 @@ class SheetOperations:
             bool: True si fue exitoso, False en caso contrario
         """
         try:
-            sheet = self.workbook.sheets(sheet_name)
+            sheet = self._get_sheet(sheet_name)
             sheet.range(range_address).clear_contents()
             logger.debug(f"Rango limpiado {sheet_name}!{range_address}")
             return True
@@ -613,7 +839,7 @@ class SheetOperations:
             dict: Información de la hoja
         """
         try:
-            sheet = self.workbook.sheets(sheet_name)
+            sheet = self._get_sheet(sheet_name)
             return {
                 'name': sheet.name,
                 'used_range': str(sheet.used_range.address) if sheet.used_range else None,
@@ -638,7 +864,7 @@ class SheetOperations:
             bool: True si fue exitoso, False en caso contrario
         """
         try:
-            sheet = self.workbook.sheets(sheet_name)
+            sheet = self._get_sheet(sheet_name)
             range_obj = sheet.range(range_address)
             
             # Apply formatting based on format_dict
@@ -19,10 +19,11 @@ y los transforma para compatibilidad con pyRofex.
 
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 import xlwings as xw
 
-from ..utils.helpers import transform_symbol_for_pyrofex
+from ..utils.helpers import transform_symbols_for_pyrofex
 from ..utils.logging import get_logger
 from ..utils.validation import validate_excel_range_data
 
@@ -43,6 +44,45 @@ class SymbolLoader:
         'panel_general': 'M2:M500' # Panel General: Columna M
     }
     
+    # Bloque completo de tickers (A-M) leído en una sola llamada a Excel
+    TICKERS_RANGE = 'A2:M500'
+    
+    # Columnas y tipos del DataFrame de opciones (bidsize/asksize sin underscore)
+    OPTIONS_COLUMNS = {
+        'bid': 'float64',
+        'ask': 'float64',
+        'bidsize': 'int64',
+        'asksize': 'int64',
+        'last': 'float64',
+        'change': 'float64',
+        'open': 'float64',
+        'high': 'float64',
+        'low': 'float64',
+        'previous_close': 'float64',
+        'turnover': 'float64',
+        'volume': 'int64',
+        'operations': 'int64',
+        'datetime': 'datetime64[ns]'
+    }
+    
+    # Columnas y tipos de los DataFrames de títulos y cauciones
+    SECURITIES_COLUMNS = {
+        'bid_size': 'int64',
+        'bid': 'float64',
+        'ask': 'float64',
+        'ask_size': 'int64',
+        'last': 'float64',
+        'change': 'float64',
+        'open': 'float64',
+        'high': 'float64',
+        'low': 'float64',
+        'previous_close': 'float64',
+        'turnover': 'float64',
+        'volume': 'int64',
+        'operations': 'int64',
+        'datetime': 'datetime64[ns]'
+    }
+    
     # Lista de cauciones (repos) predefinidas - generadas desde 1D hasta 32D
     CAUCIONES = [f"MERV - XMEV - PESOS - {i}D" for i in range(1, 33)]
     
@@ -55,6 +95,69 @@ class SymbolLoader:
         """
         self.tickers_sheet = tickers_sheet
         self.loaded_symbols = {}
+        self._ticker_columns: Optional[Dict[str, List[Any]]] = None
+    
+    def _read_ticker_columns(self) -> Dict[str, List[Any]]:
+        """
+        Leer todas las columnas de tickers con un único acceso a Excel.
+        
+        Cada acceso a un rango de xlwings cruza el límite COM, por lo que se lee
+        el bloque completo A2:M500 una sola vez y se separan las columnas en Python.
+        El resultado se guarda en caché para las llamadas siguientes.
+        
+        Returns:
+            dict: Valores de cada columna indexados por tipo de instrumento
+        """
+        if self._ticker_columns is not None:
+            return self._ticker_columns
+        
+        rows = self.tickers_sheet.range(self.TICKERS_RANGE).options(ndim=2).value or []
+        columns = list(zip(*rows)) if rows else []
+        
+        self._ticker_columns = {}
+        for instrument_type, address in self.COLUMN_MAPPINGS.items():
+            col_idx = ord(address[0]) - ord('A')
+            column = columns[col_idx] if col_idx < len(columns) else ()
+            
+            # Igual que range.expand(): tomar sólo el bloque contiguo desde la fila 2
+            values = []
+            for value in column:
+                if value is None:
+                    break
+                values.append(value)
+            self._ticker_columns[instrument_type] = values
+        
+        logger.debug(f"Leídas {len(self._ticker_columns)} columnas de tickers desde {self.TICKERS_RANGE}")
+        return self._ticker_columns
+    
+    @staticmethod
+    def _create_market_data_df(symbols: List[str], columns: Dict[str, str]) -> pd.DataFrame:
+        """
+        Crear un DataFrame de datos de mercado con columnas ya tipadas.
+        
+        Cada columna se construye directamente como un array de NumPy del tipo
+        final, indexado por símbolo, sin inferencia de tipos ni set_index posterior.
+        Un símbolo repetido (p. ej. listado en dos columnas de Tickers) queda una
+        sola vez, en su primera posición: ocupa una única fila en la hoja Prices.
+        
+        Args:
+            symbols: Símbolos para el índice
+            columns: Mapeo de nombre de columna a dtype
+            
+        Returns:
+            pd.DataFrame: DataFrame inicializado en cero, indexado por 'symbol' (sin duplicados)
+        """
+        unique_symbols = list(dict.fromkeys(symbols))
+        if len(unique_symbols) != len(symbols):
+            logger.warning(f"Ignorados {len(symbols) - len(unique_symbols)} símbolos duplicados")
+        symbols = unique_symbols
+        n = len(symbols)
+        now = pd.Timestamp.now()
+        data = {
+            col: np.full(n, now, dtype=dtype) if dtype.startswith('datetime64') else np.zeros(n, dtype=dtype)
+            for col, dtype in columns.items()
+        }
+        return pd.DataFrame(data, index=pd.Index(symbols, name='symbol'))
     
     def get_options_list(self) -> pd.DataFrame:
         """
@@ -66,50 +169,23 @@ class SymbolLoader:
         try:
             logger.debug("Cargando símbolos de opciones desde Excel")
             
-            # Get data from Excel range
-            rng = self.tickers_sheet.range(self.COLUMN_MAPPINGS['options']).expand()
-            options_data = rng.value
+            # Obtener datos desde el bloque de tickers leído en una sola llamada
+            options_data = self._read_ticker_columns()['options']
             
             if not validate_excel_range_data(options_data):
                 logger.warning("Datos de opciones inválidos desde Excel")
                 return pd.DataFrame()
             
-            # Procesar datos de opciones
-            if isinstance(options_data, list):
-                # Filter out None values and empty strings
-                valid_options = [opt for opt in options_data if opt and str(opt).strip()]
-            else:
-                # Single value
-                valid_options = [options_data] if options_data and str(options_data).strip() else []
+            # Filtrar celdas vacías y transformar símbolos para compatibilidad con pyRofex
+            transformed_options = transform_symbols_for_pyrofex(options_data)
             
-            if not valid_options:
+            if not transformed_options:
                 logger.warning("No valid options found in Excel")
                 return pd.DataFrame()
             
-            # Transformar símbolos para compatibilidad con pyRofex
-            transformed_options = [transform_symbol_for_pyrofex(opt) for opt in valid_options]
-            
             # Crear DataFrame con columnas necesarias para opciones
             # IMPORTANTE: Incluir TODAS las columnas que el WebSocket handler actualiza
-            options_df = pd.DataFrame({
-                'symbol': transformed_options,
-                'bid': 0.0,
-                'ask': 0.0,
-                'bidsize': 0,
-                'asksize': 0,
-                'last': 0.0,
-                'change': 0.0,
-                'open': 0.0,              # AGREGADO: Precio de apertura
-                'high': 0.0,              # AGREGADO: Precio máximo
-                'low': 0.0,               # AGREGADO: Precio mínimo
-                'previous_close': 0.0,    # AGREGADO: Cierre anterior
-                'turnover': 0.0,          # AGREGADO: Monto operado
-                'volume': 0,
-                'operations': 0,          # AGREGADO: Cantidad de operaciones
-                'datetime': pd.Timestamp.now()
-            })
-            
-            options_df.set_index('symbol', inplace=True)
+            options_df = self._create_market_data_df(transformed_options, self.OPTIONS_COLUMNS)
             
             self.loaded_symbols['options'] = options_df
             logger.info(f"Cargados {len(options_df)} símbolos de opciones")
@@ -186,25 +262,7 @@ class SymbolLoader:
             
             # Crear DataFrame con cauciones predefinidas
             # Coincidir con las columnas esperadas por el layout de Excel (columnas B-O)
-            cauciones_df = pd.DataFrame({
-                'symbol': self.CAUCIONES,
-                'bid_size': 0,
-                'bid': 0.0,
-                'ask': 0.0,
-                'ask_size': 0,
-                'last': 0.0,
-                'change': 0.0,
-                'open': 0.0,
-                'high': 0.0,
-                'low': 0.0,
-                'previous_close': 0.0,
-                'turnover': 0.0,
-                'volume': 0,
-                'operations': 0,
-                'datetime': pd.Timestamp.now()
-            })
-            
-            cauciones_df.set_index('symbol', inplace=True)
+            cauciones_df = self._create_market_data_df(self.CAUCIONES, self.SECURITIES_COLUMNS)
             
             self.loaded_symbols['cauciones'] = cauciones_df
             logger.info(f"Creados {len(cauciones_df)} símbolos de cauciones")
@@ -233,50 +291,23 @@ class SymbolLoader:
                 logger.error(f"Tipo de instrumento desconocido: {instrument_type}")
                 return pd.DataFrame()
             
-            # Obtener datos desde rango de Excel
-            rng = self.tickers_sheet.range(self.COLUMN_MAPPINGS[instrument_type]).expand()
-            securities_data = rng.value
+            # Obtener datos desde el bloque de tickers leído en una sola llamada
+            securities_data = self._read_ticker_columns()[instrument_type]
             
             if not validate_excel_range_data(securities_data):
                 logger.warning(f"Datos de {display_name} inválidos desde Excel")
                 return pd.DataFrame()
             
-            # Procesar datos de títulos
-            if isinstance(securities_data, list):
-                # Filtrar valores None y strings vacíos
-                valid_securities = [sec for sec in securities_data if sec and str(sec).strip()]
-            else:
-                # Valor único
-                valid_securities = [securities_data] if securities_data and str(securities_data).strip() else []
+            # Filtrar celdas vacías y transformar símbolos para compatibilidad con pyRofex
+            transformed_securities = transform_symbols_for_pyrofex(securities_data)
             
-            if not valid_securities:
+            if not transformed_securities:
                 logger.warning(f"No se encontraron {display_name} válidos en Excel")
                 return pd.DataFrame()
             
-            # Transformar símbolos para compatibilidad con pyRofex
-            transformed_securities = [transform_symbol_for_pyrofex(sec) for sec in valid_securities]
-            
             # Crear DataFrame con columnas necesarias para títulos
             # Coincidir con las columnas esperadas por el layout de Excel (columnas B-O)
-            securities_df = pd.DataFrame({
-                'symbol': transformed_securities,
-                'bid_size': 0,
-                'bid': 0.0,
-                'ask': 0.0,
-                'ask_size': 0,
-                'last': 0.0,
-                'change': 0.0,
-                'open': 0.0,
-                'high': 0.0,
-                'low': 0.0,
-                'previous_close': 0.0,
-                'turnover': 0.0,
-                'volume': 0,
-                'operations': 0,
-                'datetime': pd.Timestamp.now()
-            })
-            
-            securities_df.set_index('symbol', inplace=True)
+            securities_df = self._create_market_data_df(transformed_securities, self.SECURITIES_COLUMNS)
             
             self.loaded_symbols[instrument_type] = securities_df
             logger.info(f"Cargados {len(securities_df)} símbolos de {display_name}")
@@ -336,21 +367,40 @@ class SymbolLoader:
                 self.get_cauciones_list()
             ]
             
-            # Filtrar DataFrames vacíos
-            valid_dfs = [df for df in securities_dfs if not df.empty]
+            combined_df = self.allocate_securities_frame(
+                [symbol for df in securities_dfs for symbol in df.index]
+            )
             
-            if valid_dfs:
-                combined_df = pd.concat(valid_dfs, ignore_index=False)
+            if not combined_df.empty:
                 logger.info(f"Combinados {len(combined_df)} símbolos de títulos")
-                return combined_df
             else:
                 logger.warning("No hay datos de títulos válidos para combinar")
-                return pd.DataFrame()
+            
+            return combined_df
                 
         except Exception as e:
             logger.error(f"Error al combinar títulos: {e}")
             return pd.DataFrame()
     
+    def allocate_securities_frame(self, symbols: List[str]) -> pd.DataFrame:
+        """
+        Crear el DataFrame de datos de mercado de títulos para los símbolos dados.
+        
+        Se asigna un único DataFrame con el layout de títulos (SECURITIES_COLUMNS)
+        inicializado en cero, en el orden recibido; no se copian datos de ningún
+        otro DataFrame.
+        
+        Args:
+            symbols: Símbolos de títulos (ya transformados al formato de pyRofex)
+            
+        Returns:
+            pd.DataFrame: DataFrame inicializado en cero, vacío si no hay símbolos
+        """
+        if not symbols:
+            return pd.DataFrame()
+        
+        return self._create_market_data_df(list(symbols), self.SECURITIES_COLUMNS)
+    
     def get_symbol_count_by_type(self) -> Dict[str, int]:
         """
         Obtener conteo de símbolos por tipo de instrumento.
@@ -34,9 +34,16 @@ class WorkbookManager:
         """
         Conectar al libro de Excel.
         
+        Es idempotente: si ya hay un libro conectado se reutiliza en lugar de
+        volver a abrirlo a través de COM.
+        
         Returns:
             bool: True si la conexión es exitosa, False en caso contrario
         """
+        if self.is_connected():
+            logger.debug(f"Reutilizando conexión existente al libro: {self.excel_file}")
+            return True
+        
         try:
             # Construir ruta completa
             full_path = Path(self.excel_path) / self.excel_file
@@ -5,9 +5,12 @@ Este módulo provee la lógica principal de la aplicación y coordina
 todos los diferentes componentes.
 """
 
+import signal
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Set
 
 import pandas as pd
 
@@ -16,7 +19,8 @@ from .config import (EXCEL_FILE, EXCEL_PATH, EXCEL_SHEET_PRICES,
                      validate_excel_config, validate_pyRofex_config)
 from .excel import SheetOperations, SymbolLoader, WorkbookManager
 from .market_data import DataProcessor, WebSocketHandler, pyRofexClient
-from .utils import get_logger, log_connection_event, setup_logging
+from .utils import (flush_logging, get_logger, log_connection_event,
+                    setup_logging, shutdown_logging)
 
 logger = get_logger(__name__)
 
@@ -24,6 +28,9 @@ logger = get_logger(__name__)
 class EPGBOptionsApp:
     """Clase principal de la aplicación EPGB Options."""
     
+    # Espera máxima (segundos) entre reintentos cuando Excel rechaza las escrituras
+    EXCEL_RETRY_MAX_DELAY = 60.0
+    
     def __init__(self):
         """Inicializar la aplicación."""
         self.api_client = None
@@ -38,9 +45,18 @@ class EPGBOptionsApp:
         self.everything_df = pd.DataFrame()
         self.cauciones_df = pd.DataFrame()
         
+        # Columnas de opciones con nombres de Excel (bidsize→bid_size), calculadas una vez
+        self._options_columns: Optional[pd.Index] = None
+        self._options_excel_columns: Optional[pd.Index] = None
+        
         # Application state
         self.is_running = False
         self.last_update_time = None
+        # Señalado al pedir el cierre (Ctrl+C o shutdown) para cortar las esperas del bucle principal
+        self._stop_event = threading.Event()
+        # DataFrames cuyo último volcado a Excel falló; None hasta que arrancan los volcados
+        # (sin bucle de Excel no hay volcado final al cerrar)
+        self._failed_frames: Optional[Set[str]] = None
     
     def initialize(self) -> bool:
         """
@@ -59,16 +75,18 @@ class EPGBOptionsApp:
             if not self._validate_configurations():
                 return False
             
-            # Inicializar componentes de datos de mercado (poblar cache de instrumentos)
-            if not self._initialize_market_data_components():
-                return False
-            
-            # Inicializar componentes de Excel
-            if not self._initialize_excel_components():
-                return False
+            # Inicializar componentes de datos de mercado (autenticación y cache de instrumentos,
+            # I/O de red) en un hilo aparte, mientras Excel se inicializa en el hilo principal
+            # (los objetos COM de xlwings quedan atados al hilo que los crea)
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix='market-data-init') as executor:
+                market_data_future = executor.submit(self._initialize_market_data_components)
+                
+                # Inicializar componentes de Excel y cargar símbolos desde Excel
+                excel_ready = self._initialize_excel_components() and self._load_symbols()
+                
+                market_data_ready = market_data_future.result()
             
-            # Cargar símbolos desde Excel
-            if not self._load_symbols():
+            if not market_data_ready or not excel_ready:
                 return False
             
             # Validar y filtrar símbolos contra el cache de instrumentos
@@ -78,6 +96,9 @@ class EPGBOptionsApp:
             # Configurar referencias de datos ahora que los DataFrames están cargados y validados
             self.websocket_handler.set_data_references(self.options_df, self.everything_df, self.cauciones_df)
             
+            # Aplicar los ticks en lotes desde un hilo dedicado (libera el hilo del WebSocket)
+            self.websocket_handler.start_batch_worker()
+            
             # Configurar cache de instrumentos en sheet operations para detección de opciones
             self.sheet_operations.set_instrument_cache(self.api_client.instrument_cache)
             
@@ -163,13 +184,11 @@ class EPGBOptionsApp:
             
             # Combinar otros valores (excluir cauciones de la tabla principal)
             securities_to_combine = ['acciones', 'bonos', 'cedears', 'letras', 'ons', 'panel_general']
-            securities_dfs = [all_symbols.get(key, pd.DataFrame()) for key in securities_to_combine]
-            valid_securities = [df for df in securities_dfs if not df.empty]
-            
-            if valid_securities:
-                self.everything_df = pd.concat(valid_securities, ignore_index=False)
-            else:
-                self.everything_df = pd.DataFrame()
+            securities_symbols = [
+                symbol for key in securities_to_combine
+                for symbol in all_symbols.get(key, pd.DataFrame()).index
+            ]
+            self.everything_df = self.symbol_loader.allocate_securities_frame(securities_symbols)
             
             # Registrar resumen
             symbol_counts = self.symbol_loader.get_symbol_count_by_type()
@@ -283,6 +302,8 @@ class EPGBOptionsApp:
             # Inicializar cliente API
             self.api_client = pyRofexClient()
             if not self.api_client.initialize():
+                # Los errores de autenticación ya registrados deben quedar arriba del banner
+                flush_logging()
                 print("\n" + "="*70)
                 print("\033[91m🛑 FALLO DE INICIALIZACIÓN - La aplicación no puede continuar\033[0m")
                 print("="*70)
@@ -344,7 +365,8 @@ class EPGBOptionsApp:
             message: Mensaje de datos de mercado
         """
         self.last_update_time = datetime.now()
-        logger.debug(f"Callback de actualización de datos para {symbol}")
+        # Formato diferido: se llama por cada tick y DEBUG suele estar deshabilitado
+        logger.debug("Callback de actualización de datos para %s", symbol)
         
         # Podrías disparar actualizaciones de Excel acá o agruparlas
         # Por ahora, sólo registramos la actualización
@@ -390,30 +412,42 @@ class EPGBOptionsApp:
             logger.error(f"Error al iniciar suscripción a datos de mercado: {e}")
             return False
     
-    def update_excel_with_current_data(self) -> bool:
-        """Actualizar Excel con los datos de mercado actuales."""
+    def update_excel_with_current_data(self, dirty_frames: Optional[Set[str]] = None) -> bool:
+        """
+        Actualizar Excel con los datos de mercado actuales.
+        
+        Args:
+            dirty_frames: DataFrames modificados a escribir ('options', 'securities',
+                'cauciones'); None escribe todos
+        """
         try:
             logger.debug("Actualizando Excel con datos actuales...")
             
-            # Actualizar hoja Prices con datos de valores (excluyendo cauciones)
-            if not self.everything_df.empty:
-                success = self.sheet_operations.update_market_data_to_prices_sheet(
-                    self.everything_df, EXCEL_SHEET_PRICES, self.cauciones_df
-                )
-                if not success:
-                    logger.warning("Fallo al actualizar hoja Prices")
+            if dirty_frames is None:
+                dirty_frames = {'options', 'securities', 'cauciones'}
             
-            # Actualizar opciones en Prices sheet
-            if not self.options_df.empty:
+            # Combinar valores y opciones en un solo DataFrame para hacer una única
+            # escritura masiva en la hoja Prices (las cauciones van a su propia tabla)
+            frames = []
+            if 'securities' in dirty_frames and not self.everything_df.empty:
+                frames.append(self.everything_df)
+            if 'options' in dirty_frames and not self.options_df.empty:
                 # Opciones usan bidsize/asksize sin underscore, necesitamos renombrar para compatibilidad con Excel
-                options_for_excel = self.options_df.copy()
-                options_for_excel = options_for_excel.rename(columns={'bidsize': 'bid_size', 'asksize': 'ask_size'})
-                
+                frames.append(self.options_df.set_axis(self._get_options_excel_columns(), axis=1))
+            
+            cauciones_df = self.cauciones_df if 'cauciones' in dirty_frames else None
+            
+            if frames or cauciones_df is not None:
+                if len(frames) > 1:
+                    market_df = pd.concat(frames)
+                else:
+                    market_df = frames[0] if frames else pd.DataFrame()
                 success = self.sheet_operations.update_market_data_to_prices_sheet(
-                    options_for_excel, EXCEL_SHEET_PRICES, cauciones_df=None
+                    market_df, EXCEL_SHEET_PRICES, cauciones_df
                 )
                 if not success:
-                    logger.warning("Fallo al actualizar opciones en Prices")
+                    logger.warning("Fallo al actualizar hoja Prices")
+                    return False
             
             logger.debug("Actualización de Excel completada")
             return True
@@ -422,12 +456,48 @@ class EPGBOptionsApp:
             logger.error(f"Error al actualizar Excel: {e}")
             return False
     
+    def _excel_retry_delay(self, consecutive_failures: int) -> float:
+        """
+        Calcular la espera antes del próximo volcado a Excel.
+        
+        Sin fallas es el intervalo configurado; tras cada falla consecutiva se
+        duplica (Excel ocupado o en modo edición rechaza las llamadas COM),
+        hasta EXCEL_RETRY_MAX_DELAY.
+        
+        Args:
+            consecutive_failures: Cantidad de volcados fallidos seguidos
+            
+        Returns:
+            float: Segundos a esperar desde el último volcado
+        """
+        return min(EXCEL_UPDATE_INTERVAL * (1 << min(consecutive_failures, 16)),
+                   max(self.EXCEL_RETRY_MAX_DELAY, EXCEL_UPDATE_INTERVAL))
+    
+    def _get_options_excel_columns(self) -> pd.Index:
+        """
+        Obtener las columnas de opciones con los nombres de la hoja Prices.
+        
+        Las columnas sólo cambian al recargar símbolos, así que el Index renombrado
+        se reutiliza entre volcados (set_axis con un Index listo evita rename).
+        
+        Returns:
+            pd.Index: Columnas de options_df con bidsize/asksize como bid_size/ask_size
+        """
+        columns = self.options_df.columns
+        if self._options_columns is None or not columns.equals(self._options_columns):
+            renames = {'bidsize': 'bid_size', 'asksize': 'ask_size'}
+            self._options_columns = columns
+            self._options_excel_columns = pd.Index([renames.get(col, col) for col in columns])
+        return self._options_excel_columns
+    
     def run(self):
         """Ejecutar el bucle principal de la aplicación."""
         try:
             logger.info("🚀 Iniciando aplicación de Datos de Mercado EPGB Options")
             
             if not self.initialize():
+                # Los errores ya registrados deben quedar arriba del banner
+                flush_logging()
                 print("\n" + "="*70)
                 print("\033[91m💥 FALLO DE INICIO DE APLICACIÓN\033[0m")
                 print("="*70)
@@ -458,34 +528,86 @@ class EPGBOptionsApp:
             time.sleep(2)
             logger.info("Iniciando actualizaciones de Excel")
             
+            # Ctrl+C sólo pide detener el bucle: el volcado en curso a Excel termina
+            # y los ticks pendientes se escriben en shutdown()
+            previous_sigint = None
+            if threading.current_thread() is threading.main_thread():
+                previous_sigint = signal.signal(signal.SIGINT, self._handle_sigint)
+            
             # Bucle principal de la aplicación
             try:
+                last_flush = 0.0
+                self._failed_frames = set()
+                consecutive_failures = 0
                 while self.is_running:
-                    # Actualizar Excel periódicamente
-                    self.update_excel_with_current_data()
+                    # Sin ticks nuevos (ni volcados fallidos) no hay nada que escribir: bloquear
+                    # hasta que llegue uno (despertando cada intervalo para revisar is_running)
+                    if not self._failed_frames and not self.websocket_handler.wait_for_updates(EXCEL_UPDATE_INTERVAL):
+                        continue
                     
-                    # Dormir por el intervalo configurado
-                    time.sleep(EXCEL_UPDATE_INTERVAL)
+                    # Acumular ticks hasta cumplir el intervalo (o el backoff tras fallas) desde el último volcado
+                    remaining = last_flush + self._excel_retry_delay(consecutive_failures) - time.monotonic()
+                    if remaining > 0 and self._stop_event.wait(remaining):
+                        break
+                    
+                    # Los DataFrames de un volcado fallido se reintentan aunque no lleguen ticks nuevos
+                    dirty_frames = self.websocket_handler.consume_dirty_frames() | self._failed_frames
+                    if dirty_frames and not self.update_excel_with_current_data(dirty_frames):
+                        self._failed_frames = dirty_frames
+                        consecutive_failures += 1
+                        logger.warning(f"Reintentando actualización de Excel en {self._excel_retry_delay(consecutive_failures):.1f}s")
+                    else:
+                        self._failed_frames = set()
+                        consecutive_failures = 0
+                    last_flush = time.monotonic()
                     
             except KeyboardInterrupt:
                 logger.info("Interrupción de teclado recibida - cerrando correctamente")
+            finally:
+                if previous_sigint is not None:
+                    signal.signal(signal.SIGINT, previous_sigint)
             
         except Exception as e:
             logger.error(f"Error en bucle principal de la aplicación: {e}")
         finally:
             self.shutdown()
     
+    def _handle_sigint(self, signum, frame):
+        """
+        Manejador de SIGINT: pedir que el bucle principal termine.
+        
+        Un segundo Ctrl+C mientras se cierra interrumpe de inmediato.
+        """
+        if self._stop_event.is_set():
+            raise KeyboardInterrupt
+        logger.info("Interrupción de teclado recibida - cerrando correctamente")
+        self.is_running = False
+        self._stop_event.set()
+    
     def shutdown(self):
         """Cerrar la aplicación correctamente."""
         try:
             logger.info("Cerrando aplicación...")
             
             self.is_running = False
+            self._stop_event.set()
             
-            # Cerrar cliente API
+            # Cerrar cliente API (no llegan más ticks)
             if self.api_client:
                 self.api_client.close_connection()
             
+            # Detener el worker de lotes (aplica los mensajes pendientes)
+            if self.websocket_handler:
+                self.websocket_handler.stop_batch_worker()
+            
+            # Volcado final, una vez cortado el feed y aplicada la cola: incluye todo lo
+            # recibido desde el último ciclo y lo que quedó de un volcado fallido
+            if self._failed_frames is not None and self.websocket_handler:
+                dirty_frames = self.websocket_handler.consume_dirty_frames() | self._failed_frames
+                self._failed_frames = None
+                if dirty_frames:
+                    self.update_excel_with_current_data(dirty_frames)
+            
             # Desconectar de Excel
             if self.workbook_manager:
                 self.workbook_manager.disconnect()
@@ -494,6 +616,9 @@ class EPGBOptionsApp:
             
         except Exception as e:
             logger.error(f"Error durante el cierre: {e}")
+        finally:
+            # Escribir los registros pendientes y detener el hilo de logging
+            shutdown_logging()
     
     def get_status_report(self) -> Dict[str, Any]:
         """
@@ -10,11 +10,25 @@ import pyRofex
 
 from ..config.pyrofex_config import (ACCOUNT, API_URL, ENVIRONMENT, PASSWORD,
                                      USER, WS_URL)
-from ..utils.logging import get_logger
+from ..utils.logging import flush_logging, get_logger
 from .instrument_cache import InstrumentCache
 
 logger = get_logger(__name__)
 
+# Entradas de datos de mercado necesarias para las columnas de Excel (resueltas una sola vez)
+_MARKET_DATA_ENTRIES = (
+    pyRofex.MarketDataEntry.BIDS,               # Mejor compra (BI)
+    pyRofex.MarketDataEntry.OFFERS,             # Mejor venta (OF)
+    pyRofex.MarketDataEntry.LAST,               # Última operación (LA)
+    pyRofex.MarketDataEntry.OPENING_PRICE,      # Precio de apertura (OP)
+    pyRofex.MarketDataEntry.CLOSING_PRICE,      # Cierre anterior (CL)
+    pyRofex.MarketDataEntry.HIGH_PRICE,         # Precio máximo (HI)
+    pyRofex.MarketDataEntry.LOW_PRICE,          # Precio mínimo (LO)
+    pyRofex.MarketDataEntry.TRADE_EFFECTIVE_VOLUME,  # Monto operado (EV)
+    pyRofex.MarketDataEntry.NOMINAL_VOLUME,     # Volumen (NV)
+    pyRofex.MarketDataEntry.TRADE_COUNT,        # Operaciones/cantidad de operaciones (TC)
+)
+
 
 class pyRofexClient:
     """Wrapper del cliente API de pyRofex."""
@@ -48,6 +62,8 @@ class pyRofexClient:
             
             # Verificar si es un error de autenticación
             if "Authentication fails" in error_msg or "Incorrect User or Password" in error_msg:
+                # El banner va después de los registros ya encolados
+                flush_logging()
                 print("\n" + "="*70)
                 print("\033[91m❌ FALLO DE AUTENTICACIÓN\033[0m")
                 print("="*70)
@@ -188,19 +204,7 @@ class pyRofexClient:
             raise RuntimeError("Cliente no inicializado. Llamá a initialize() primero.")
             
         if entries is None:
-            # Solicitar todas las entradas de datos de mercado disponibles necesarias para las columnas de Excel
-            entries = [
-                pyRofex.MarketDataEntry.BIDS,               # Mejor compra (BI)
-                pyRofex.MarketDataEntry.OFFERS,             # Mejor venta (OF)
-                pyRofex.MarketDataEntry.LAST,               # Última operación (LA)
-                pyRofex.MarketDataEntry.OPENING_PRICE,      # Precio de apertura (OP)
-                pyRofex.MarketDataEntry.CLOSING_PRICE,      # Cierre anterior (CL)
-                pyRofex.MarketDataEntry.HIGH_PRICE,         # Precio máximo (HI)
-                pyRofex.MarketDataEntry.LOW_PRICE,          # Precio mínimo (LO)
-                pyRofex.MarketDataEntry.TRADE_EFFECTIVE_VOLUME,  # Monto operado (EV)
-                pyRofex.MarketDataEntry.NOMINAL_VOLUME,     # Volume (NV)
-                pyRofex.MarketDataEntry.TRADE_COUNT,        # Operations/number of trades (TC)
-            ]
+            entries = list(_MARKET_DATA_ENTRIES)
             
         try:
             return pyRofex.get_market_data(symbols, entries)
@@ -226,22 +230,8 @@ class pyRofexClient:
         
         logger.debug(f"Suscribiendo a {len(symbols)} símbolos pre-validados")
         
-        # Definir entradas de datos de mercado necesarias para las columnas de Excel
-        entries = [
-            pyRofex.MarketDataEntry.BIDS,               # Mejor compra (BI)
-            pyRofex.MarketDataEntry.OFFERS,             # Mejor venta (OF)
-            pyRofex.MarketDataEntry.LAST,               # Última operación (LA)
-            pyRofex.MarketDataEntry.OPENING_PRICE,      # Precio de apertura (OP)
-            pyRofex.MarketDataEntry.CLOSING_PRICE,      # Cierre anterior (CL)
-            pyRofex.MarketDataEntry.HIGH_PRICE,         # Precio máximo (HI)
-            pyRofex.MarketDataEntry.LOW_PRICE,          # Precio mínimo (LO)
-            pyRofex.MarketDataEntry.TRADE_EFFECTIVE_VOLUME,  # Monto operado (EV)
-            pyRofex.MarketDataEntry.NOMINAL_VOLUME,     # Volumen (NV)
-            pyRofex.MarketDataEntry.TRADE_COUNT,        # Operaciones/cantidad de operaciones (TC)
-        ]
-            
         try:
-            pyRofex.market_data_subscription(tickers=symbols, entries=entries)
+            pyRofex.market_data_subscription(tickers=symbols, entries=list(_MARKET_DATA_ENTRIES))
             logger.info(f"Suscripto a datos de mercado para {len(symbols)} símbolos")
             return True
         except Exception as e:
@@ -81,11 +81,12 @@ class DataProcessor:
             
             # Apply change percentage conversion (if change column exists)
             if 'change' in processed_df.columns:
-                processed_df['change'] = processed_df['change'] / 100
+                processed_df['change'] /= 100
             
-            # Ensure datetime column is properly formatted
+            # Ensure datetime column is properly formatted (skip if already datetime64)
             if 'datetime' in processed_df.columns:
-                processed_df['datetime'] = pd.to_datetime(processed_df['datetime'])
+                if not pd.api.types.is_datetime64_any_dtype(processed_df['datetime']):
+                    processed_df['datetime'] = pd.to_datetime(processed_df['datetime'])
             else:
                 processed_df['datetime'] = pd.Timestamp.now()
             
@@ -151,10 +152,11 @@ class DataProcessor:
                 
                 # Apply repos-specific transformations
                 if 'change' in processed_df.columns:
-                    processed_df['change'] = processed_df['change'] / 100
+                    processed_df['change'] /= 100
                 
                 if 'datetime' in processed_df.columns:
-                    processed_df['datetime'] = pd.to_datetime(processed_df['datetime'])
+                    if not pd.api.types.is_datetime64_any_dtype(processed_df['datetime']):
+                        processed_df['datetime'] = pd.to_datetime(processed_df['datetime'])
                 else:
                     processed_df['datetime'] = pd.Timestamp.now()
                 
@@ -5,12 +5,18 @@ Este módulo maneja conexiones de WebSocket, procesamiento de mensajes y manejo
 para datos de mercado en tiempo real desde pyRofex.
 """
 
+import logging
+import threading
+import time
+import traceback
+from collections import deque
 from datetime import datetime
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 
+import numpy as np
 import pandas as pd
 
-from ..utils.helpers import get_excel_safe_value
+from ..utils.helpers import MARKET_DATA_FIELDS, get_excel_safe_value
 from ..utils.logging import (get_logger, log_connection_event,
                              log_market_data_event)
 from ..utils.validation import (safe_float_conversion, safe_int_conversion,
@@ -19,10 +25,65 @@ from .instrument_cache import InstrumentCache
 
 logger = get_logger(__name__)
 
+# Frames de traza a registrar en DEBUG (los más cercanos al error)
+_TRACEBACK_LIMIT = 5
+
+
+def _format_traceback(error: BaseException) -> str:
+    """Formatear la traza de una excepción, acotada a los últimos _TRACEBACK_LIMIT frames."""
+    return ''.join(traceback.format_exception(
+        type(error), error, error.__traceback__, limit=-_TRACEBACK_LIMIT
+    ))
+
+
+def _extract_price(value: Any) -> float:
+    """Extraer un precio que pyRofex envía como número o como {price}."""
+    if isinstance(value, dict):
+        return safe_float_conversion(value.get('price'))
+    return safe_float_conversion(value)
+
+
+class ConnectionStats:
+    """
+    Estadísticas de conexión del WebSocket.
+    
+    Se actualizan en cada mensaje, así que usan __slots__ (acceso directo a
+    atributos en lugar de un dict); get_connection_stats() las expone como dict.
+    """
+    
+    __slots__ = ('messages_received', 'messages_processed', 'messages_coalesced',
+                 'errors', 'last_message_time', 'connection_start')
+    
+    def __init__(self, connection_start: Optional[datetime] = None):
+        self.messages_received = 0
+        self.messages_processed = 0
+        self.messages_coalesced = 0
+        self.errors = 0
+        self.last_message_time: Optional[datetime] = None
+        self.connection_start = connection_start
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Devolver las estadísticas como diccionario."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
 
 class WebSocketHandler:
     """Maneja conexiones de WebSocket y el procesamiento de mensajes."""
     
+    # Las opciones usan bidsize/asksize sin underscore
+    OPTIONS_COLUMN_RENAMES = {'bid_size': 'bidsize', 'ask_size': 'asksize'}
+    
+    # Orden de los valores de cada fila extraída de un mensaje (tupla, sin dict por tick);
+    # es el mismo orden de columnas que escribe SheetOperations en la hoja Prices
+    MARKET_DATA_FIELDS = MARKET_DATA_FIELDS
+    
+    # Lotes de ticks: espera máxima (segundos) desde el primer mensaje y tamaño máximo por lote
+    BATCH_MAX_WAIT = 0.05
+    BATCH_MAX_SIZE = 500
+    
+    # Cantidad de mensajes crudos volcados en DEBUG al inicio (diagnóstico del formato de pyRofex)
+    RAW_MESSAGE_LOG_LIMIT = 3
+    
     def __init__(self, instrument_cache: Optional[InstrumentCache] = None):
         """
         Inicializar manejador de WebSocket.
@@ -31,22 +92,40 @@ class WebSocketHandler:
             instrument_cache: Instancia opcional de InstrumentCache para clasificación precisa de instrumentos
         """
         self.is_connected = False
-        self.connection_stats = {
-            'messages_received': 0,
-            'messages_processed': 0, 
-            'errors': 0,
-            'last_message_time': None,
-            'connection_start': None
-        }
+        self.connection_stats = ConnectionStats()
         
         # Referencias de almacenamiento de datos (serán configuradas por la aplicación principal)
         self.options_df = None
         self.everything_df = None
         self.cauciones_df = None
         
+        # Arreglos numpy por columna (uno por DataFrame) que reciben los ticks;
+        # se vuelcan a los DataFrames sólo en consume_dirty_frames()
+        self._column_stores: Dict[str, Optional[Dict[str, Any]]] = {}
+        # DataFrame al que pertenece cada símbolo cargado (clasificación por hash)
+        self._symbol_frames: Dict[str, str] = {}
+        
         # Instrument cache for classification
         self.instrument_cache = instrument_cache or InstrumentCache()
         
+        # DataFrames modificados desde el último volcado a Excel ('options', 'securities', 'cauciones').
+        # Arranca con todos marcados para que el primer volcado escriba todo.
+        self._dirty_frames: Set[str] = {'options', 'securities', 'cauciones'}
+        # Protege tanto el conjunto de modificados como los arreglos de columnas
+        self._dirty_lock = threading.Lock()
+        # Señalado cuando el conjunto de modificados deja de estar vacío (ver wait_for_updates)
+        self._dirty_event = threading.Event()
+        self._dirty_event.set()
+        
+        # Mensajes pendientes para el worker de lotes (ver start_batch_worker)
+        self._pending_messages = deque()
+        self._pending_event = threading.Event()
+        self._batch_worker: Optional[threading.Thread] = None
+        self._batch_worker_running = False
+        
+        # Mensajes aplicados hasta ahora por _apply_market_data_message (modo directo o por lotes)
+        self._messages_applied = 0
+        
         # Callbacks
         self.on_data_update = None  # Callback para cuando los datos se actualizan
     
@@ -55,15 +134,201 @@ class WebSocketHandler:
         self.options_df = options_df
         self.everything_df = everything_df
         self.cauciones_df = cauciones_df if cauciones_df is not None else pd.DataFrame()
+        
+        with self._dirty_lock:
+            self._column_stores = {
+                'options': self._build_column_store(self.options_df, self.OPTIONS_COLUMN_RENAMES),
+                'securities': self._build_column_store(self.everything_df),
+                'cauciones': self._build_column_store(self.cauciones_df),
+            }
+            # Misma precedencia que la clasificación por tipo: opciones > cauciones > valores
+            self._symbol_frames = {}
+            for frame_name in ('securities', 'cauciones', 'options'):
+                store = self._column_stores[frame_name]
+                if store is not None:
+                    self._symbol_frames.update(dict.fromkeys(store['rows'], frame_name))
+    
+    @staticmethod
+    def _build_column_store(df: pd.DataFrame,
+                            renames: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Crear los arreglos contiguos por columna para un DataFrame.
+        
+        Args:
+            df: DataFrame indexado por símbolo
+            renames: Renombres de campos entrantes a columnas del DataFrame
+                     (p. ej. bid_size→bidsize), resueltos una sola vez acá
+            
+        Returns:
+            dict: Mapa símbolo→fila ('rows'), un np.ndarray por columna ('columns') y
+                  el arreglo destino de cada campo de MARKET_DATA_FIELDS ('targets',
+                  None si el DataFrame no tiene esa columna), o None si está vacío
+        """
+        if df is None or df.empty:
+            return None
+        columns = {col: df[col].to_numpy(copy=True) for col in df.columns}
+        fields = dict(columns)
+        for field, col in (renames or {}).items():
+            if col in columns:
+                fields[field] = columns[col]
+        return {
+            'rows': {symbol: row for row, symbol in enumerate(df.index)},
+            'columns': columns,
+            'targets': tuple(fields.get(field) for field in WebSocketHandler.MARKET_DATA_FIELDS),
+        }
+    
+    def _get_frame(self, frame_name: str) -> Optional[pd.DataFrame]:
+        """Obtener el DataFrame asociado a un nombre ('options', 'securities', 'cauciones')."""
+        if frame_name == 'options':
+            return self.options_df
+        if frame_name == 'securities':
+            return self.everything_df
+        if frame_name == 'cauciones':
+            return self.cauciones_df
+        return None
+    
+    def _flush_column_store(self, frame_name: str):
+        """Volcar los arreglos de columnas de un DataFrame sobre el DataFrame (requiere _dirty_lock)."""
+        store = self._column_stores.get(frame_name)
+        df = self._get_frame(frame_name)
+        if store is None or df is None:
+            return
+        for col, values in store['columns'].items():
+            df[col] = values.copy()
     
     def set_update_callback(self, callback: Callable):
         """Configurar función de callback para actualizaciones de datos."""
         self.on_data_update = callback
     
+    def _mark_dirty(self, frame_name: str):
+        """Marcar un DataFrame como modificado desde el último volcado a Excel."""
+        with self._dirty_lock:
+            if not self._dirty_frames:
+                self._dirty_event.set()
+            self._dirty_frames.add(frame_name)
+    
+    def consume_dirty_frames(self) -> Set[str]:
+        """
+        Obtener y limpiar el conjunto de DataFrames modificados.
+        
+        Antes de devolverlos, vuelca los ticks acumulados en los arreglos de
+        columnas sobre cada DataFrame modificado.
+        
+        Returns:
+            set: Nombres de los DataFrames modificados desde la última llamada
+        """
+        with self._dirty_lock:
+            dirty_frames, self._dirty_frames = self._dirty_frames, set()
+            self._dirty_event.clear()
+            for frame_name in dirty_frames:
+                self._flush_column_store(frame_name)
+        return dirty_frames
+    
+    def wait_for_updates(self, timeout: Optional[float] = None) -> bool:
+        """
+        Esperar a que llegue algún tick desde el último consume_dirty_frames().
+        
+        Args:
+            timeout: Tiempo máximo de espera en segundos (None espera indefinidamente)
+            
+        Returns:
+            bool: True si hay DataFrames modificados pendientes de volcar
+        """
+        return self._dirty_event.wait(timeout)
+    
+    def start_batch_worker(self):
+        """
+        Procesar los mensajes de mercado en lotes desde un hilo dedicado.
+        
+        Con el worker activo, market_data_handler sólo encola el mensaje. El worker
+        espera hasta BATCH_MAX_WAIT desde el primer mensaje, drena la cola y aplica
+        sólo el último mensaje de cada símbolo (cada mensaje trae el estado completo).
+        """
+        if self._batch_worker is not None and self._batch_worker.is_alive():
+            return
+        self._batch_worker_running = True
+        self._batch_worker = threading.Thread(
+            target=self._batch_worker_loop, name='market-data-batch', daemon=True
+        )
+        self._batch_worker.start()
+        logger.debug("Worker de lotes de datos de mercado iniciado")
+    
+    def stop_batch_worker(self, timeout: float = 1.0):
+        """
+        Detener el worker de lotes y aplicar los mensajes que quedaron en la cola.
+        
+        La cola sólo se drena acá si el hilo terminó: si sigue aplicando un lote,
+        dos hilos consumirían la misma cola a la vez.
+        
+        Args:
+            timeout: Tiempo máximo de espera (segundos) para que termine el hilo
+            
+        Returns:
+            bool: True si el worker terminó y la cola quedó drenada
+        """
+        self._batch_worker_running = False
+        self._pending_event.set()
+        if self._batch_worker is not None:
+            self._batch_worker.join(timeout)
+            if self._batch_worker.is_alive():
+                logger.warning(f"El worker de lotes no terminó en {timeout}s; la cola no se drenó")
+                return False
+            self._batch_worker = None
+        self.process_pending_messages()
+        return True
+    
+    def _batch_worker_loop(self):
+        """Bucle del worker de lotes: esperar mensajes, dejar que se acumulen y aplicarlos."""
+        while self._batch_worker_running:
+            self._pending_event.wait()
+            if not self._batch_worker_running:
+                break
+            time.sleep(self.BATCH_MAX_WAIT)
+            self._pending_event.clear()
+            try:
+                self.process_pending_messages()
+            except Exception as e:
+                logger.error(f"Error en el worker de lotes de datos de mercado: {e}")
+    
+    def process_pending_messages(self) -> int:
+        """
+        Drenar la cola de mensajes pendientes y aplicarlos en lotes de hasta BATCH_MAX_SIZE.
+        
+        Returns:
+            int: Cantidad de mensajes drenados
+        """
+        drained = 0
+        while self._pending_messages:
+            # Último mensaje por símbolo; los mensajes sin símbolo se conservan para reportar el error
+            batch = {}
+            batch_size = min(len(self._pending_messages), self.BATCH_MAX_SIZE)
+            for _ in range(batch_size):
+                message = self._pending_messages.popleft()
+                try:
+                    key = message['instrumentId']['symbol']
+                    hash(key)  # Un símbolo no hashable (lista, dict) no puede ser clave del lote
+                except (KeyError, TypeError):
+                    key = id(message)
+                batch[key] = message
+            
+            drained += batch_size
+            self.connection_stats.messages_received += batch_size
+            self.connection_stats.messages_coalesced += batch_size - len(batch)
+            # Una sola marca de tiempo por lote para la columna datetime
+            now = datetime.now()
+            received_at = np.datetime64(now, 'ns')
+            self.connection_stats.last_message_time = now
+            for message in batch.values():
+                self._apply_market_data_message(message, received_at)
+        return drained
+    
     def market_data_handler(self, message: Dict[str, Any]):
         """
         Manejar mensajes de datos de mercado desde el WebSocket de pyRofex.
         
+        Si el worker de lotes está activo el mensaje sólo se encola; si no, se
+        aplica en el momento.
+        
         Estructura esperada del mensaje de pyRofex:
         {
             "symbol": "MERV - XMEV - YPFD - 24hs",
@@ -86,29 +351,47 @@ class WebSocketHandler:
         Args:
             message: Mensaje de datos de mercado desde pyRofex
         """
-        self.connection_stats['messages_received'] += 1
-        self.connection_stats['last_message_time'] = datetime.now()
+        if self._batch_worker_running:
+            self._pending_messages.append(message)
+            self._pending_event.set()
+            return
         
-        # DEBUG: Log raw message structure for first few messages
-        if self.connection_stats['messages_received'] <= 3:
-            logger.debug(f"MENSAJE CRUDO #{self.connection_stats['messages_received']}: {message}")
+        now = datetime.now()
+        self.connection_stats.messages_received += 1
+        self.connection_stats.last_message_time = now
+        self._apply_market_data_message(message, np.datetime64(now, 'ns'))
+    
+    def _apply_market_data_message(self, message: Dict[str, Any], received_at: np.datetime64):
+        """
+        Validar un mensaje de datos de mercado y aplicarlo al DataFrame correspondiente.
+        
+        Args:
+            message: Mensaje de datos de mercado desde pyRofex
+            received_at: Marca de tiempo a guardar en la columna datetime
+        """
+        # DEBUG: Log raw message structure for first few messages (counted per applied message:
+        # in batch mode messages_received already includes the whole batch)
+        self._messages_applied += 1
+        if self._messages_applied <= self.RAW_MESSAGE_LOG_LIMIT:
+            logger.debug("MENSAJE CRUDO #%d: %s", self._messages_applied, message)
         
         try:
-            # Validate message structure
-            if not validate_market_data(message):
+            # Extract symbol (EAFP): pyRofex messages are almost always well formed, so the
+            # full validate_market_data only runs on failure, to log the concrete reason
+            try:
+                symbol = message['instrumentId']['symbol']
+                valid_symbol = bool(symbol.strip())
+            except (KeyError, TypeError, AttributeError):
+                valid_symbol = False
+            if not valid_symbol:
+                validate_market_data(message)
                 logger.warning(f"Mensaje de datos de mercado inválido: {message}")
-                self.connection_stats['errors'] += 1
-                return
-            
-            # Extract symbol
-            symbol = message.get('instrumentId', {}).get('symbol')
-            if not symbol:
-                logger.warning("No hay símbolo en el mensaje de datos de mercado")
+                self.connection_stats.errors += 1
                 return
             
             # Process market data
-            self._process_market_data(symbol, message)
-            self.connection_stats['messages_processed'] += 1
+            self._process_market_data(symbol, message, received_at)
+            self.connection_stats.messages_processed += 1
             
             log_market_data_event(symbol, "data_update")
             
@@ -122,16 +405,16 @@ class WebSocketHandler:
         except Exception as e:
             self._handle_processing_error(e, message)
     
-    def _process_market_data(self, symbol: str, message: Dict[str, Any]):
+    def _process_market_data(self, symbol: str, message: Dict[str, Any], received_at: np.datetime64):
         """Procesar datos de mercado y actualizar el DataFrame correspondiente."""
         
         # Extract market data fields
         market_data = message.get('marketData', {})
         
         # DEBUG: Log market data extraction for first symbol
-        if self.connection_stats['messages_processed'] < 2:
-            logger.debug(f"Procesando símbolo: {symbol}")
-            logger.debug(f"Campos de datos de mercado: {market_data}")
+        if self.connection_stats.messages_processed < 2:
+            logger.debug("Procesando símbolo: %s", symbol)
+            logger.debug("Campos de datos de mercado: %s", market_data)
 
         # Extracción de campos anidados (pyRofex 0.5.0 usa estructuras anidadas)
         # Mapeo de campos del mensaje de WebSocket de pyRofex:
@@ -148,63 +431,72 @@ class WebSocketHandler:
         # SE = SETTLEMENT_PRICE (número o {price})
         # OI = OPEN_INTEREST (número)
 
-        bids = market_data.get('BI', [])
-        offers = market_data.get('OF', [])
-        last_trade = market_data.get('LA', {})
+        md_get = market_data.get
+        bids = md_get('BI')
+        offers = md_get('OF')
+        last_trade = md_get('LA')
 
-        # Extract best bid/offer (first level in the book)
-        best_bid = bids[0] if bids and isinstance(bids, list) else {}
-        best_offer = offers[0] if offers and isinstance(offers, list) else {}
-
-        # Helper function to extract price from either number or dict
-        def extract_price(value):
-            if isinstance(value, dict):
-                return safe_float_conversion(value.get('price'))
-            return safe_float_conversion(value)
+        # Extract best bid/offer (first level in the book); anything that is not a dict counts as empty
+        best_bid = bids[0] if bids and isinstance(bids, list) else None
+        best_offer = offers[0] if offers and isinstance(offers, list) else None
+        if not isinstance(best_bid, dict):
+            best_bid = {}
+        if not isinstance(best_offer, dict):
+            best_offer = {}
 
         # Extract key prices for change calculation
         last_price = safe_float_conversion(last_trade.get('price') if isinstance(last_trade, dict) else None)
-        previous_close = extract_price(market_data.get('CL'))
+        previous_close = _extract_price(md_get('CL'))
 
         # Calculate change percentage: (last / previous_close) - 1
         change = 0.0
         if last_price and previous_close and previous_close != 0:
             change = ((last_price / previous_close) - 1)
 
-        # Create data row compatible with existing Excel structure
-        data_row = {
-            'bid_size': safe_int_conversion(best_bid.get('size') if isinstance(best_bid, dict) else None),
-            'bid': safe_float_conversion(best_bid.get('price') if isinstance(best_bid, dict) else None),
-            'ask': safe_float_conversion(best_offer.get('price') if isinstance(best_offer, dict) else None),
-            'ask_size': safe_int_conversion(best_offer.get('size') if isinstance(best_offer, dict) else None),
-            'last': last_price,
-            'change': change,
-            'open': extract_price(market_data.get('OP')),
-            'high': extract_price(market_data.get('HI')),
-            'low': extract_price(market_data.get('LO')),
-            'previous_close': previous_close,
-            'turnover': safe_float_conversion(market_data.get('EV')),      # TRADE_EFFECTIVE_VOLUME
-            'volume': safe_int_conversion(market_data.get('NV')),          # NOMINAL_VOLUME
-            'operations': safe_int_conversion(market_data.get('TC')),      # TRADE_COUNT
-            'datetime': pd.Timestamp.now()
-        }
+        bid = safe_float_conversion(best_bid.get('price'))
+        ask = safe_float_conversion(best_offer.get('price'))
 
-        # DEBUG: Registrar valores extraídos
-        if self.connection_stats['messages_processed'] < 2:
-            logger.debug(f"Fila de datos extraída: {data_row}")
+        # Create data row compatible with existing Excel structure (MARKET_DATA_FIELDS order)
+        row_values = (
+            safe_int_conversion(best_bid.get('size')),    # bid_size
+            bid,
+            ask,
+            safe_int_conversion(best_offer.get('size')),  # ask_size
+            last_price,
+            change,
+            _extract_price(md_get('OP')),                 # open
+            _extract_price(md_get('HI')),                 # high
+            _extract_price(md_get('LO')),                 # low
+            previous_close,
+            safe_float_conversion(md_get('EV')),          # turnover (TRADE_EFFECTIVE_VOLUME)
+            safe_int_conversion(md_get('NV')),            # volume (NOMINAL_VOLUME)
+            safe_int_conversion(md_get('TC')),            # operations (TRADE_COUNT)
+            received_at                                   # datetime (ya en datetime64[ns])
+        )
 
-        # Create DataFrame for this update
-        update_df = pd.DataFrame([data_row], index=[symbol])
+        # DEBUG: Registrar valores extraídos
+        if self.connection_stats.messages_processed < 2 and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Fila de datos extraída: %s", dict(zip(self.MARKET_DATA_FIELDS, row_values)))
 
-        # Determine which DataFrame to update based on symbol characteristics
-        if self._is_options_symbol(symbol):
-            self._update_options_data(symbol, update_df)
+        # Determine which DataFrame to update: symbols loaded at startup resolve with a
+        # single hash lookup; unknown ones fall back to classification by symbol characteristics
+        # (the row is applied directly, without building an intermediate one-row DataFrame)
+        frame_name = self._symbol_frames.get(symbol)
+        if frame_name == 'options':
+            self._update_options_data(symbol, row_values)
+        elif frame_name == 'securities':
+            self._update_securities_data(symbol, row_values)
+        elif frame_name == 'cauciones':
+            self._update_cauciones_data(symbol, row_values)
+        elif self._is_options_symbol(symbol):
+            self._update_options_data(symbol, row_values)
         elif self._is_caucion_symbol(symbol):
-            self._update_cauciones_data(symbol, update_df)
+            self._update_cauciones_data(symbol, row_values)
         else:
-            self._update_securities_data(symbol, update_df)
+            self._update_securities_data(symbol, row_values)
 
-        logger.debug(f"Actualizado {symbol}: last={data_row['last']}, bid={data_row['bid']}, ask={data_row['ask']}")
+        # Formato diferido (%s): este log corre en cada tick y no debe armar el string si DEBUG está apagado
+        logger.debug("Actualizado %s: last=%s, bid=%s, ask=%s", symbol, last_price, bid, ask)
     
     def _is_options_symbol(self, symbol: str) -> bool:
         """
@@ -224,50 +516,64 @@ class WebSocketHandler:
     def _is_caucion_symbol(self, symbol: str) -> bool:
         """Determina si el símbolo representa una caución (repo)."""
         # Las cauciones tienen formato "MERV - XMEV - PESOS - XD" donde X es la cantidad de días
-        return 'PESOS' in symbol and symbol.split(' - ')[-1].endswith('D')
+        # (rpartition sólo corta el último segmento, sin armar la lista completa de split)
+        return 'PESOS' in symbol and symbol.rpartition(' - ')[2].endswith('D')
     
-    def _update_options_data(self, symbol: str, update_df: pd.DataFrame):
-        """Actualizar el DataFrame de opciones."""
-        if self.options_df is not None and not self.options_df.empty:
-            # Rename columns for options compatibility
-            update_df = update_df.rename(columns={"bid_size": "bidsize", "ask_size": "asksize"})
-            update_df = update_df.drop(['expiration', 'strike', 'kind'], axis=1, errors='ignore')
+    def _store_row(self, frame_name: str, symbol: str, row_values: Tuple[Any, ...]) -> bool:
+        """
+        Escribir una fila de datos en los arreglos de columnas de un DataFrame.
+        
+        Args:
+            frame_name: 'options', 'securities' o 'cauciones'
+            symbol: Símbolo a actualizar
+            row_values: Valores en el orden de MARKET_DATA_FIELDS
             
-            # Use .loc[] assignment instead of .update() to ensure values are set
-            if symbol in self.options_df.index:
-                for col in update_df.columns:
-                    if col in self.options_df.columns:
-                        self.options_df.loc[symbol, col] = update_df.loc[symbol, col]
+        Returns:
+            bool: True si el símbolo existe en el DataFrame y fue actualizado
+        """
+        store = self._column_stores.get(frame_name)
+        row = store['rows'].get(symbol)
+        if row is None:
+            return False
+        with self._dirty_lock:
+            for values, value in zip(store['targets'], row_values):
+                if values is not None:
+                    values[row] = value
+            if not self._dirty_frames:
+                self._dirty_event.set()
+            self._dirty_frames.add(frame_name)
+        return True
+    
+    def _update_options_data(self, symbol: str, row_values: Tuple[Any, ...]):
+        """Actualizar el DataFrame de opciones."""
+        if self._column_stores.get('options') is not None:
+            # bid_size/ask_size llegan a bidsize/asksize vía el store (sin renombrar por tick)
+            self._store_row('options', symbol, row_values)
         else:
             logger.warning(f"DataFrame de opciones no inicializado para el símbolo: {symbol}")
     
-    def _update_securities_data(self, symbol: str, update_df: pd.DataFrame):
+    def _update_securities_data(self, symbol: str, row_values: Tuple[Any, ...]):
         """Actualizar el DataFrame de valores (securities).""" 
-        if self.everything_df is not None and not self.everything_df.empty:
-            # Use .loc[] assignment instead of .update() to ensure values are set
-            if symbol in self.everything_df.index:
-                for col in update_df.columns:
-                    if col in self.everything_df.columns:
-                        old_value = self.everything_df.loc[symbol, col]
-                        new_value = update_df.loc[symbol, col]
-                        self.everything_df.loc[symbol, col] = new_value
-                        # DEBUG: Log first update to confirm write
-                        if self.connection_stats['messages_processed'] <= 3 and col in ['bid', 'ask', 'last']:
-                            logger.debug(f"DataFrame UPDATE: {symbol} {col}: {old_value} → {new_value}")
-            else:
-                logger.warning(f"Símbolo '{symbol}' no encontrado en everything_df.index. El índice tiene {len(self.everything_df.index)} símbolos.")
+        store = self._column_stores.get('securities')
+        if store is not None:
+            # DEBUG: Log first updates to confirm write
+            if self.connection_stats.messages_processed <= 3 and symbol in store['rows']:
+                row = store['rows'][symbol]
+                data_row = dict(zip(self.MARKET_DATA_FIELDS, row_values))
+                for col in ('bid', 'ask', 'last'):
+                    if col in store['columns']:
+                        logger.debug("DataFrame UPDATE: %s %s: %s → %s", symbol, col, store['columns'][col][row], data_row[col])
+            
+            if not self._store_row('securities', symbol, row_values):
+                logger.warning(f"Símbolo '{symbol}' no encontrado en everything_df.index. El índice tiene {len(store['rows'])} símbolos.")
         else:
             logger.warning(f"DataFrame de valores no inicializado para el símbolo: {symbol}")
     
-    def _update_cauciones_data(self, symbol: str, update_df: pd.DataFrame):
+    def _update_cauciones_data(self, symbol: str, row_values: Tuple[Any, ...]):
         """Actualizar DataFrame de cauciones (separado de la tabla principal de valores).""" 
-        if self.cauciones_df is not None and not self.cauciones_df.empty:
-            # Use .loc[] assignment instead of .update() to ensure values are set
-            if symbol in self.cauciones_df.index:
-                for col in update_df.columns:
-                    if col in self.cauciones_df.columns:
-                        self.cauciones_df.loc[symbol, col] = update_df.loc[symbol, col]
-                logger.debug(f"Caución actualizada: {symbol}")
+        if self._column_stores.get('cauciones') is not None:
+            if self._store_row('cauciones', symbol, row_values):
+                logger.debug("Caución actualizada: %s", symbol)
             else:
                 logger.warning(f"Símbolo de caución '{symbol}' no encontrado en cauciones_df.index")
         else:
@@ -275,28 +581,22 @@ class WebSocketHandler:
     
     def _handle_processing_error(self, error: Exception, message: Dict[str, Any]):
         """Manejar errores ocurridos durante el procesamiento de mensajes."""
-        self.connection_stats['errors'] += 1
-        
-        error_context = {
-            'error': str(error),
-            'message_type': type(message).__name__,
-            'has_symbol': 'instrumentId' in message if isinstance(message, dict) else 'unknown',
-            'symbol': message.get('instrumentId', {}).get('symbol', 'unknown') if isinstance(message, dict) else 'unknown',
-            'timestamp': datetime.now().isoformat()
-        }
+        self.connection_stats.errors += 1
+        
+        # Sólo el contexto que se registra (la hora ya la agrega el formateador de logging)
+        symbol = message.get('instrumentId', {}).get('symbol', 'unknown') if isinstance(message, dict) else 'unknown'
         logger.error(f"Error al procesar datos de mercado: {error}")
-        logger.error(f"Contexto: Símbolo={error_context['symbol']}, Tipo={error_context['message_type']}")
+        logger.error(f"Contexto: Símbolo={symbol}, Tipo={type(message).__name__}")
         logger.info("Continuando con el procesamiento de otros mensajes - error no crítico")
         
-        # Log detailed error for debugging
-        if hasattr(error, '__traceback__'):
-            import traceback
-            logger.debug(f"Detalles técnicos: {traceback.format_exc()}")
+        # Log detailed error for debugging (the trace is only built if DEBUG is enabled)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Detalles técnicos: {_format_traceback(error)}")
     
     def websocket_error_handler(self, error):
         """Manejar mensajes de error del WebSocket."""
         try:
-            self.connection_stats['errors'] += 1
+            self.connection_stats.errors += 1
             log_connection_event("Error WebSocket", str(error))
             
             logger.error(f"Error de WebSocket recibido: {error}")
@@ -330,16 +630,16 @@ class WebSocketHandler:
     def websocket_exception_handler(self, exception):
         """Manejar excepciones del WebSocket."""
         try:
-            self.connection_stats['errors'] += 1
+            self.connection_stats.errors += 1
             log_connection_event("Excepción WebSocket", str(exception))
             
             logger.error(f"Excepción de WebSocket: {exception}")
             logger.error(f"Tipo de excepción: {type(exception)}")
             
-            # Log exception details
-            if hasattr(exception, '__traceback__'):
-                import traceback
-                logger.debug(f"Traza de la excepción: {traceback.format_exc()}")
+            # Log exception details (the exception arrives as an argument, outside any
+            # except block, so its own __traceback__ is formatted instead of format_exc())
+            if isinstance(exception, BaseException) and logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"Traza de la excepción: {_format_traceback(exception)}")
             
             # IMPORTANT: Don't raise exceptions - just log and continue
             logger.info("Excepción registrada, continúo escuchando datos de mercado...")
@@ -351,14 +651,14 @@ class WebSocketHandler:
     
     def on_error(self, online, error):
         """Manejar errores generales."""
-        self.connection_stats['errors'] += 1
+        self.connection_stats.errors += 1
         log_connection_event("Error general", f"Online: {online}, Error: {error}")
         
         logger.error(f"Error general - Online: {online}, Error: {error}")
     
     def get_connection_stats(self) -> Dict[str, Any]:
         """Obtener estadísticas de conexión."""
-        stats = self.connection_stats.copy()
+        stats = self.connection_stats.to_dict()
         
         # Add calculated fields
         if stats['connection_start']:
@@ -371,7 +671,8 @@ class WebSocketHandler:
         total_messages = stats['messages_received']
         if total_messages > 0:
             stats['error_rate'] = stats['errors'] / total_messages
-            stats['success_rate'] = stats['messages_processed'] / total_messages
+            # Los mensajes reemplazados por uno más nuevo del mismo símbolo no son fallas
+            stats['success_rate'] = (stats['messages_processed'] + stats['messages_coalesced']) / total_messages
         else:
             stats['error_rate'] = 0.0
             stats['success_rate'] = 0.0
@@ -380,10 +681,4 @@ class WebSocketHandler:
     
     def reset_stats(self):
         """Reset connection statistics."""
-        self.connection_stats = {
-            'messages_received': 0,
-            'messages_processed': 0,
-            'errors': 0,
-            'last_message_time': None,
-            'connection_start': datetime.now()
-        }
\ No newline at end of file
+        self.connection_stats = ConnectionStats(connection_start=datetime.now())
\ No newline at end of file
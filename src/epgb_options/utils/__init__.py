@@ -6,11 +6,12 @@ y funciones helper generales.
 """
 
 from .helpers import format_timestamp, safe_float_conversion
-from .logging import get_logger, log_connection_event, setup_logging
+from .logging import (flush_logging, get_logger, log_connection_event,
+                      setup_logging, shutdown_logging)
 from .validation import validate_market_data, validate_symbol
 
 __all__ = [
-    'setup_logging', 'get_logger', 'log_connection_event',
+    'setup_logging', 'flush_logging', 'shutdown_logging', 'get_logger', 'log_connection_event',
     'validate_market_data', 'validate_symbol', 
     'format_timestamp', 'safe_float_conversion'
 ]
\ No newline at end of file
@@ -4,8 +4,10 @@ Utilidades auxiliares generales para EPGB Options.
 Este módulo provee funciones de utilidad general usadas en toda la aplicación.
 """
 
+import re
 from datetime import date, datetime
-from typing import Any, Optional
+from functools import lru_cache
+from typing import Any, List, Optional
 
 import numpy as np
 import pandas as pd
@@ -14,6 +16,25 @@ from ..utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Campos de datos de mercado de cada instrumento, en el orden de las columnas B:O de la hoja
+# Prices: única definición para el almacenamiento de ticks y la escritura en Excel
+MARKET_DATA_FIELDS = (
+    'bid_size', 'bid', 'ask', 'ask_size', 'last', 'change', 'open',
+    'high', 'low', 'previous_close', 'turnover', 'volume', 'operations', 'datetime'
+)
+
+# Patrones y sufijos precompilados para la transformación de símbolos
+MERV_PREFIX = "MERV - XMEV - "
+_SPOT_SUFFIX = " - spot"
+_OPTION_PATTERN = re.compile(r'\s+\d+\s+[CP]$')
+_FOREIGN_MARKET_PATTERN = re.compile(r'\.(CME|BRA|MIN|CRN)/')
+_MONTH_PATTERN = re.compile(r'(ENE|FEB|MAR|ABR|MAY|JUN|JUL|AGO|SEP|OCT|NOV|DIC)\d{2}')
+_SETTLEMENT_SUFFIXES = (
+    " - 24hs", " - 48hs", " - 72hs",
+    " - CI", " - spot",  # CI/spot are equivalent
+    " - T0", " - T1", " - T2",  # Settlement codes
+)
+
 
 def format_timestamp(timestamp: datetime = None, format_string: str = "%Y-%m-%d %H:%M:%S") -> str:
     """
@@ -53,10 +74,16 @@ def safe_float_conversion(value: Any, default: float = 0.0) -> float:
         return default
 
 
+@lru_cache(maxsize=32768)
 def transform_symbol_for_pyrofex(raw_symbol: str) -> str:
     """
     Transform symbols for pyRofex compatibility.
     
+    Results are memoized: the transform is pure, and the same raw symbols are
+    transformed again on every reload of the Tickers sheet. The cache is sized
+    above the full symbol universe, since an LRU smaller than the sheet would
+    evict every entry before it is reused on the next reload.
+    
     Rules based on actual pyRofex API symbols (instruments_cache.json analysis):
     - Add "MERV - XMEV - " prefix ONLY to MERV market securities (stocks, bonds, etc.)
     - Do NOT add prefix to: options, futures (ROS/DLR/ORO/WTI/etc), most indices
@@ -77,6 +104,7 @@ def transform_symbol_for_pyrofex(raw_symbol: str) -> str:
         - "YPFD - 24hs" → "MERV - XMEV - YPFD - 24hs" (prefix + preserved suffix)
         - "GGAL - spot" → "MERV - XMEV - GGAL - CI" (prefix + spot→CI conversion)
         - "I.MERVAL" → "MERV - XMEV - I.MERVAL" (special case: MERVAL index gets prefix)
+        - "MERV - XMEV - GGAL - spot" → "MERV - XMEV - GGAL - CI" (already prefixed, spot→CI only)
         
         Non-MERV Securities (NO prefix):
         - "SOJ.ROS/MAY26 292 C" → "SOJ.ROS/MAY26 292 C" (option, no changes)
@@ -91,13 +119,14 @@ def transform_symbol_for_pyrofex(raw_symbol: str) -> str:
     # Strip whitespace
     symbol = raw_symbol.strip()
     
-    # Skip if already has MERV prefix
-    if symbol.startswith("MERV - XMEV - "):
-        return symbol
+    # Replace " - spot" suffix with " - CI" (before checking prefix logic).
+    # Slicing touches only the suffix, unlike a full-string replace.
+    if symbol.endswith(_SPOT_SUFFIX):
+        symbol = symbol[:-len(_SPOT_SUFFIX)] + " - CI"
     
-    # Replace " - spot" with " - CI" (before checking prefix logic)
-    if symbol.endswith(" - spot"):
-        symbol = symbol.replace(" - spot", " - CI")
+    # Already prefixed (e.g. pasted from pyRofex): nothing else to do
+    if symbol.startswith(MERV_PREFIX):
+        return symbol
     
     # Determine if this symbol needs MERV prefix
     needs_prefix = _should_add_merv_prefix(symbol)
@@ -109,12 +138,28 @@ def transform_symbol_for_pyrofex(raw_symbol: str) -> str:
             symbol = f"{symbol} - 24hs"
         
         # Add MERV prefix
-        return f"MERV - XMEV - {symbol}"
+        return f"{MERV_PREFIX}{symbol}"
     else:
         # No prefix needed, return as-is
         return symbol
 
 
+def transform_symbols_for_pyrofex(raw_symbols: List[Any]) -> List[Any]:
+    """
+    Transform a whole column of raw Excel symbols for pyRofex in a single pass.
+    
+    Blank cells (None or whitespace-only strings) are dropped; every other value
+    goes through transform_symbol_for_pyrofex.
+    
+    Args:
+        raw_symbols: Raw symbols from Excel
+        
+    Returns:
+        list: Transformed symbols, in the same order as the input
+    """
+    return [transform_symbol_for_pyrofex(raw) for raw in raw_symbols if raw and str(raw).strip()]
+
+
 def _should_add_merv_prefix(symbol: str) -> bool:
     """
     Determine if a symbol should have the "MERV - XMEV - " prefix added.
@@ -144,8 +189,7 @@ def _should_add_merv_prefix(symbol: str) -> bool:
     
     # Check if it's an option (ends with " C" or " P" after a number)
     # Pattern: "XXX/MMM## NNN C" or "XXX/MMM## NNN P"
-    import re
-    if re.search(r'\s+\d+\s+[CP]$', symbol):
+    if _OPTION_PATTERN.search(symbol):
         return False
     
     # Check if it's a ROS market future/option (contains ".ROS/")
@@ -166,7 +210,7 @@ def _should_add_merv_prefix(symbol: str) -> bool:
         return False
     
     # Check for other international markets (.CME/, .BRA/, .MIN/, .CRN/, etc.)
-    if re.search(r'\.(CME|BRA|MIN|CRN)/', symbol):
+    if _FOREIGN_MARKET_PATTERN.search(symbol):
         return False
     
     # Check for DISPO market (e.g., "GIR.ROS.P/DISPO")
@@ -197,17 +241,9 @@ def _should_add_default_suffix(symbol: str) -> bool:
     Returns:
         bool: True if default suffix should be added
     """
-    # Known settlement suffixes
-    settlement_suffixes = [
-        " - 24hs", " - 48hs", " - 72hs",
-        " - CI", " - spot",  # CI/spot are equivalent
-        " - T0", " - T1", " - T2",  # Settlement codes
-    ]
-    
-    # Check if already has a settlement suffix
-    for suffix in settlement_suffixes:
-        if symbol.endswith(suffix):
-            return False
+    # Check if already has a known settlement suffix
+    if symbol.endswith(_SETTLEMENT_SUFFIXES):
+        return False
     
     # Check if it's a CAUCION (format: "PESOS - XD" where X is 1-2 digits)
     if "PESOS" in symbol:
@@ -216,8 +252,7 @@ def _should_add_default_suffix(symbol: str) -> bool:
             return False
     
     # Check if it's an option (ends with " C" or " P")
-    import re
-    if re.search(r'\s+\d+\s+[CP]$', symbol):
+    if _OPTION_PATTERN.search(symbol):
         return False
     
     # Check if it's an INDEX (starts with I.)
@@ -232,8 +267,7 @@ def _should_add_default_suffix(symbol: str) -> bool:
     
     # Check for month codes in futures (e.g., "DLR/ENE25", "GGAL/FEB25")
     # This is redundant with "/" check but kept for clarity
-    month_pattern = r'(ENE|FEB|MAR|ABR|MAY|JUN|JUL|AGO|SEP|OCT|NOV|DIC)\d{2}'
-    if re.search(month_pattern, symbol):
+    if _MONTH_PATTERN.search(symbol):
         return False
     
     # Default: add suffix (for stocks, bonds, cedears, etc.)
@@ -352,6 +386,42 @@ def get_excel_safe_value(value: Any) -> Any:
     return value
 
 
+def get_excel_safe_values(df: pd.DataFrame) -> np.ndarray:
+    """
+    Get Excel-safe values for a whole DataFrame (vectorized get_excel_safe_value).
+    
+    Works column by column on the underlying arrays: non-finite floats become 0,
+    numeric and datetime columns are boxed in one pass (datetimes as Python
+    datetime, NaT as None), and only object/string columns fall back to the
+    per-value conversion. The result only holds plain Python values; naive
+    datetimes still need a timezone before a raw COM assignment.
+    
+    Args:
+        df: DataFrame to convert
+        
+    Returns:
+        np.ndarray: 2-D object array with Excel-safe values, in column order
+    """
+    # Column-major, so each per-column assignment below is a contiguous write
+    block = np.empty(df.shape, dtype=object, order='F')
+    for position, (_, column) in enumerate(df.items()):
+        dtype = column.dtype
+        if pd.api.types.is_float_dtype(dtype) and isinstance(dtype, np.dtype):
+            values = column.to_numpy(dtype=float, copy=True)
+            values[~np.isfinite(values)] = 0
+            block[:, position] = values.tolist()
+        elif (pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype)) and isinstance(dtype, np.dtype):
+            block[:, position] = column.to_numpy().tolist()
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            # Plain (naive) datetime objects; NaT becomes an empty cell
+            values = np.array(column.dt.to_pydatetime(), dtype=object)
+            values[column.isna().to_numpy()] = None
+            block[:, position] = values
+        else:
+            block[:, position] = [get_excel_safe_value(value) for value in column.to_numpy(dtype=object)]
+    return block
+
+
 def batch_list(items: list, batch_size: int) -> list:
     """
     Split a list into batches.
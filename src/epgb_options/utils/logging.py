@@ -4,20 +4,40 @@ Utilidades de logging para EPGB Options.
 Este módulo provee configuración centralizada de logging y utilidades.
 """
 
+import atexit
 import logging
 import sys
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import SimpleQueue
+
+# Logger de eventos de mercado, resuelto una sola vez (log_market_data_event corre en cada tick)
+_market_data_logger = logging.getLogger("market_data")
+
+# Hilo que escribe los registros encolados en consola/archivo (ver setup_logging)
+_queue_listener = None
 
 
 def setup_logging(level=logging.INFO, log_file=None):
     """
     Configurar logging.
     
+    El logger raíz sólo encola los registros; un QueueListener los escribe en
+    consola/archivo desde su propio hilo, así el hilo de datos de mercado y el
+    bucle de Excel no esperan la escritura en stdout.
+    
     Args:
         level: Nivel de logging (por defecto: INFO)
         log_file: Ruta opcional del archivo de log
     """
+    global _queue_listener
+    
+    # Detener el listener de una configuración anterior (vacía su cola)
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+    
     # Crear formateador
     formatter = logging.Formatter(
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
@@ -33,7 +53,7 @@ def setup_logging(level=logging.INFO, log_file=None):
     # Manejador de consola
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # Manejador de archivo (si se especifica)
     if log_file:
@@ -42,7 +62,38 @@ def setup_logging(level=logging.INFO, log_file=None):
         
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    log_queue = SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _queue_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+
+def flush_logging():
+    """
+    Escribir en consola/archivo los registros encolados hasta ahora.
+    
+    Llamar antes de un print() que deba aparecer después de esos registros
+    (p. ej. los banners de error que remiten a los mensajes de arriba).
+    """
+    if _queue_listener is not None:
+        # stop() drena la cola y espera al hilo; start() lo vuelve a levantar
+        _queue_listener.stop()
+        _queue_listener.start()
+
+
+def shutdown_logging():
+    """Escribir los registros pendientes y detener el hilo de logging."""
+    global _queue_listener
+    
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+# Vaciar la cola también si el proceso termina sin pasar por shutdown()
+atexit.register(shutdown_logging)
 
 
 def get_logger(name):
@@ -103,9 +154,8 @@ def log_market_data_event(symbol, event_type, data=None):
         event_type: Tipo de evento de datos de mercado  
         data: Datos de mercado opcionales
     """
-    logger = get_logger("market_data")
-    
+    # Formato diferido: sin costo de formateo cuando DEBUG está deshabilitado
     if data:
-        logger.debug(f"Evento: {symbol} - {event_type}: {data}")
+        _market_data_logger.debug("Evento: %s - %s: %s", symbol, event_type, data)
     else:
-        logger.debug(f"Evento: {symbol} - {event_type}")
\ No newline at end of file
+        _market_data_logger.debug("Evento: %s - %s", symbol, event_type)
\ No newline at end of file
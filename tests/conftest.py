@@ -19,4 +19,22 @@ def sample_market_data():
         'ask': 1005.0,
         'last': 1002.5,
         'volume': 1500
-    }
\ No newline at end of file
+    }
+
+
+@pytest.fixture
+def instrument_cache_stub():
+    """InstrumentCache stub that classifies every symbol the same way.
+
+    Call it with the classification to use, e.g. ``instrument_cache_stub(is_option=False)``.
+    """
+    from epgb_options.market_data.instrument_cache import InstrumentCache
+
+    class StubInstrumentCache(InstrumentCache):
+        def __init__(self, is_option):
+            self._is_option = is_option
+
+        def is_option_symbol(self, symbol):
+            return self._is_option
+
+    return StubInstrumentCache
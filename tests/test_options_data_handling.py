@@ -281,6 +281,156 @@ def test_no_data_loss_in_update_pipeline():
     print(f"   turnover={options_for_excel.loc[symbol, 'turnover']}, volume={options_for_excel.loc[symbol, 'volume']}, operations={options_for_excel.loc[symbol, 'operations']}")
 
 
+def test_websocket_handler_tracks_dirty_frames(instrument_cache_stub):
+    """Verificar que sólo los DataFrames actualizados quedan marcados para volcar a Excel."""
+    securities_df = pd.DataFrame({'bid': [0.0], 'last': [0.0]},
+                                 index=['MERV - XMEV - GGAL - 24hs'])
+    handler = WebSocketHandler(instrument_cache=instrument_cache_stub(is_option=False))
+    handler.set_data_references(pd.DataFrame(), securities_df, pd.DataFrame())
+
+    # El primer volcado escribe todo
+    assert handler.wait_for_updates(0)
+    assert handler.consume_dirty_frames() == {'options', 'securities', 'cauciones'}
+    assert handler.consume_dirty_frames() == set()
+    assert not handler.wait_for_updates(0)
+
+    handler.market_data_handler({
+        'instrumentId': {'symbol': 'MERV - XMEV - GGAL - 24hs'},
+        'marketData': {'LA': {'price': 100.0}, 'BI': [{'price': 99.0, 'size': 10}]}
+    })
+
+    assert handler.wait_for_updates(0)
+    assert handler.consume_dirty_frames() == {'securities'}
+    assert securities_df.loc['MERV - XMEV - GGAL - 24hs', 'last'] == 100.0
+
+
+def test_websocket_handler_updates_options_with_renamed_columns(instrument_cache_stub):
+    """Verificar que las opciones reciben bid_size/ask_size como bidsize/asksize."""
+    symbol = 'MERV - XMEV - GFGC38566O - 24hs'
+    options_df = pd.DataFrame({'bid': [0.0], 'bidsize': [0], 'asksize': [0]}, index=[symbol])
+    handler = WebSocketHandler(instrument_cache=instrument_cache_stub(is_option=True))
+    handler.set_data_references(options_df, pd.DataFrame(), pd.DataFrame())
+
+    handler.market_data_handler({
+        'instrumentId': {'symbol': symbol},
+        'marketData': {'BI': [{'price': 604.44, 'size': 10}], 'OF': [{'price': 630.0, 'size': 7}]}
+    })
+
+    # Los ticks se acumulan en los arreglos de columnas hasta el volcado
+    assert options_df.loc[symbol, 'bid'] == 0.0
+    assert handler.consume_dirty_frames() == {'options', 'securities', 'cauciones'}
+
+    assert options_df.loc[symbol, 'bid'] == 604.44
+    assert options_df.loc[symbol, 'bidsize'] == 10
+    assert options_df.loc[symbol, 'asksize'] == 7
+
+
+def test_batch_worker_coalesces_messages_per_symbol(instrument_cache_stub):
+    """Verificar que el worker de lotes aplica sólo el último mensaje de cada símbolo."""
+    symbol = 'MERV - XMEV - GGAL - 24hs'
+    securities_df = pd.DataFrame({'bid': [0.0], 'last': [0.0]}, index=[symbol])
+    handler = WebSocketHandler(instrument_cache=instrument_cache_stub(is_option=False))
+    handler.set_data_references(pd.DataFrame(), securities_df, pd.DataFrame())
+
+    handler.start_batch_worker()
+    for price in (100.0, 101.0, 102.0):
+        handler.market_data_handler({
+            'instrumentId': {'symbol': symbol},
+            'marketData': {'LA': {'price': price}}
+        })
+    handler.stop_batch_worker()
+
+    stats = handler.get_connection_stats()
+    assert stats['messages_received'] == 3
+    assert stats['messages_processed'] + stats['messages_coalesced'] == 3
+    assert stats['success_rate'] == 1.0
+
+    handler.consume_dirty_frames()
+    assert securities_df.loc[symbol, 'last'] == 102.0
+
+
+def test_stop_batch_worker_does_not_drain_while_worker_is_alive(instrument_cache_stub):
+    """Verificar que la cola no se drena desde dos hilos si el worker no terminó a tiempo."""
+    import threading
+
+    symbol = 'MERV - XMEV - GGAL - 24hs'
+    securities_df = pd.DataFrame({'bid': [0.0], 'last': [0.0]}, index=[symbol])
+    handler = WebSocketHandler(instrument_cache=instrument_cache_stub(is_option=False))
+    handler.set_data_references(pd.DataFrame(), securities_df, pd.DataFrame())
+
+    # Worker ocupado aplicando un lote: no termina dentro del timeout
+    release = threading.Event()
+    busy_worker = threading.Thread(target=release.wait, daemon=True)
+    busy_worker.start()
+    handler._batch_worker = busy_worker
+    handler._batch_worker_running = True
+    handler.market_data_handler({'instrumentId': {'symbol': symbol}, 'marketData': {'LA': {'price': 100.0}}})
+
+    assert not handler.stop_batch_worker(timeout=0.01)
+    assert len(handler._pending_messages) == 1
+
+    release.set()
+    assert handler.stop_batch_worker()
+    assert not handler._pending_messages
+
+
+def test_batch_keeps_valid_messages_next_to_unhashable_symbol(instrument_cache_stub):
+    """Verificar que un símbolo no hashable no descarta el resto del lote."""
+    symbol = 'MERV - XMEV - GGAL - 24hs'
+    securities_df = pd.DataFrame({'bid': [0.0], 'last': [0.0]}, index=[symbol])
+    handler = WebSocketHandler(instrument_cache=instrument_cache_stub(is_option=False))
+    handler.set_data_references(pd.DataFrame(), securities_df, pd.DataFrame())
+
+    handler._batch_worker_running = True  # Encolar sin hilo: el lote se drena a mano
+    handler.market_data_handler({'instrumentId': {'symbol': symbol}, 'marketData': {'LA': {'price': 100.0}}})
+    handler.market_data_handler({'instrumentId': {'symbol': ['no', 'hashable']}, 'marketData': {}})
+    handler._batch_worker_running = False
+
+    assert handler.process_pending_messages() == 2
+
+    stats = handler.get_connection_stats()
+    assert stats['messages_received'] == 2
+    assert stats['messages_processed'] == 1
+    assert stats['errors'] == 1
+    handler.consume_dirty_frames()
+    assert securities_df.loc[symbol, 'last'] == 100.0
+
+
+def test_raw_message_dump_covers_first_batched_messages(instrument_cache_stub, caplog):
+    """Verificar que los primeros mensajes crudos se vuelcan también en modo por lotes."""
+    import logging
+
+    symbol = 'MERV - XMEV - GGAL - 24hs'
+    securities_df = pd.DataFrame({'bid': [0.0], 'last': [0.0]}, index=[symbol])
+    handler = WebSocketHandler(instrument_cache=instrument_cache_stub(is_option=False))
+    handler.set_data_references(pd.DataFrame(), securities_df, pd.DataFrame())
+
+    handler._batch_worker_running = True  # Encolar sin hilo: el lote se drena a mano
+    for index in range(10):
+        handler.market_data_handler({'instrumentId': {'symbol': f'{symbol}{index}'}, 'marketData': {}})
+    handler._batch_worker_running = False
+
+    with caplog.at_level(logging.DEBUG, logger='epgb_options.market_data.websocket_handler'):
+        handler.process_pending_messages()
+
+    raw_dumps = [record for record in caplog.records if 'MENSAJE CRUDO' in record.getMessage()]
+    assert len(raw_dumps) == WebSocketHandler.RAW_MESSAGE_LOG_LIMIT
+
+
+def test_websocket_handler_rejects_messages_without_symbol():
+    """Verificar que los mensajes mal formados se cuentan como error sin interrumpir el handler."""
+    handler = WebSocketHandler(instrument_cache=None)
+    handler.set_data_references(pd.DataFrame(), pd.DataFrame(), pd.DataFrame())
+
+    for message in ({}, {'instrumentId': {}}, {'instrumentId': {'symbol': '  '}}, ['no-dict']):
+        handler.market_data_handler(message)
+
+    stats = handler.get_connection_stats()
+    assert stats['messages_received'] == 4
+    assert stats['messages_processed'] == 0
+    assert stats['errors'] == 4
+
+
 if __name__ == "__main__":
     print("Ejecutando tests de manejo de datos de opciones...\n")
     
@@ -289,5 +439,6 @@ if __name__ == "__main__":
     test_safe_conversions_handle_none_properly()
     test_excel_field_order_matches_dataframe()
     test_no_data_loss_in_update_pipeline()
+    test_websocket_handler_rejects_messages_without_symbol()
     
     print("\n🎉 ¡Todos los tests pasaron exitosamente!")
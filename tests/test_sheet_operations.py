@@ -0,0 +1,301 @@
+"""
+Tests para las escrituras masivas de SheetOperations sobre la hoja de precios.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pandas as pd
+
+from epgb_options.excel import sheet_operations
+from epgb_options.excel.sheet_operations import SheetOperations
+
+
+class FakeRange:
+    """Rango que registra las escrituras en la hoja falsa."""
+
+    def __init__(self, sheet, address):
+        self.sheet = sheet
+        self.address = address
+        self.font = SimpleNamespace(bold=False)
+
+    @property
+    def value(self):
+        return self.sheet.cells.get(self.address)
+
+    @value.setter
+    def value(self, data):
+        self.sheet.writes.append((self.address, data))
+        self.sheet.cells[self.address] = data
+
+    @property
+    def raw_value(self):
+        return self.value
+
+    @raw_value.setter
+    def raw_value(self, data):
+        self.sheet.raw_writes.append((self.address, data))
+        self.sheet.cells[self.address] = data
+
+    def options(self, *args, **kwargs):
+        return self
+
+
+class FakeSheet:
+    """Hoja mínima compatible con la API de xlwings usada por SheetOperations."""
+
+    def __init__(self):
+        self.name = 'HomeBroker'
+        self.cells = {}
+        self.writes = []
+        self.raw_writes = []
+        self.range_calls = []
+
+    def range(self, address):
+        self.range_calls.append(address)
+        return FakeRange(self, address)
+
+    @property
+    def used_range(self):
+        rows = [int(''.join(filter(str.isdigit, address.split(':')[-1])) or 1) for address in self.cells]
+        return SimpleNamespace(last_cell=SimpleNamespace(row=max(rows, default=1)))
+
+
+class FakeWorkbook:
+    """Libro falso con una única hoja."""
+
+    def __init__(self, sheet):
+        self.sheet = sheet
+        self.sheet_calls = 0
+
+    def sheets(self, name):
+        self.sheet_calls += 1
+        return self.sheet
+
+
+def _cauciones_df():
+    symbols = ['MERV - XMEV - PESOS - 1D', 'MERV - XMEV - PESOS - 3D']
+    return pd.DataFrame({
+        'bid_size': [100, 300],
+        'bid': [30.0, 31.0],
+        'ask': [32.0, 33.0],
+        'ask_size': [200, 400],
+        'last': [31.5, 32.5],
+        'volume': [1000, 3000],
+    }, index=pd.Index(symbols, name='symbol'))
+
+
+def test_cauciones_table_is_written_in_one_bulk_range():
+    """La tabla de cauciones se escribe en un solo rango con vencimientos correctos."""
+    sheet = FakeSheet()
+    ops = SheetOperations(workbook=None)
+
+    ops._update_cauciones_table(sheet, _cauciones_df())
+
+    assert len(sheet.writes) == 1
+    address, bulk = sheet.writes[0]
+    assert address == 'S2:Y4'
+
+    today = date.today()
+    assert bulk[0] == [today + timedelta(days=1), 0.315, 1000, 100, 0.30, 0.32, 200]
+    assert bulk[1] == [None] * 7  # 2D no está en el DataFrame
+    assert bulk[2][0] == today + timedelta(days=3)
+    assert bulk[2][1] == 0.325
+
+
+def _securities_df():
+    symbols = ['MERV - XMEV - GGAL - 24hs', 'MERV - XMEV - YPFD - 24hs']
+    return pd.DataFrame({
+        'bid_size': [10, 20],
+        'bid': [100.0, 200.0],
+        'ask': [101.0, 201.0],
+        'ask_size': [11, 21],
+        'last': [100.5, 200.5],
+    }, index=pd.Index(symbols, name='symbol'))
+
+
+def test_prices_sheet_update_reuses_cached_sheet_and_ranges():
+    """Las actualizaciones sucesivas reutilizan la hoja y el rango ya resueltos."""
+    sheet = FakeSheet()
+    workbook = FakeWorkbook(sheet)
+    ops = SheetOperations(workbook)
+    df = _securities_df()
+
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    df['bid'] += 1.0
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+
+    assert workbook.sheet_calls == 1
+    assert sheet.range_calls.count('B2:O3') == 1
+
+    data_writes = [(address, data.tolist()) for address, data in sheet.writes if address[0] != 'A']
+    assert [address for address, _ in data_writes] == ['B2:O3', 'C2:C3']
+    bulk = data_writes[0][1]
+    assert bulk[0][:5] == [10, 100.0, 101.0, 11, 100.5]
+    assert bulk[0][5:] == [0] * 9  # Campos ausentes en el DataFrame
+    assert bulk[1][0] == 20
+    assert data_writes[1][1] == [[101.0], [201.0]]  # Sólo la columna que cambió
+
+
+def test_prices_sheet_writes_only_changed_rows():
+    """Sólo se reescriben las filas que cambiaron, sin pisar filas ajenas al DataFrame."""
+    sheet = FakeSheet()
+    ops = SheetOperations(FakeWorkbook(sheet))
+    df = _securities_df()
+    df.loc['MERV - XMEV - YPFD - 24hs', 'bid'] = float('nan')
+    ops._symbol_row_cache = {'MERV - XMEV - GGAL - 24hs': 2, 'MERV - XMEV - YPFD - 24hs': 4}
+
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    # La fila 3 no pertenece al DataFrame: se escribe en dos rangos en lugar de uno con None
+    assert [address for address, _ in sheet.writes] == ['B2:O2', 'B4:O4']
+    assert sheet.writes[-1][1].tolist()[0][:3] == [20, 0, 201.0]
+
+    # Sin cambios no se escribe nada
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert len(sheet.writes) == 2
+
+    df.loc['MERV - XMEV - GGAL - 24hs', 'last'] = 99.0
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert [address for address, _ in sheet.writes[2:]] == ['F2:F2']
+
+    # El rango de cada tramo abarca de la primera a la última columna modificada
+    df.loc['MERV - XMEV - GGAL - 24hs', ['bid', 'last']] = [101.0, 98.0]
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert sheet.writes[-1][0] == 'C2:F2'
+    assert sheet.writes[-1][1].tolist() == [[101.0, 101.0, 11, 98.0]]
+
+
+class FakeApp:
+    """App de Excel que registra los cambios de screen_updating y calculation."""
+
+    def __init__(self):
+        object.__setattr__(self, 'changes', [])
+        object.__setattr__(self, 'screen_updating', True)
+        object.__setattr__(self, 'calculation', 'semiautomatic')
+
+    def __setattr__(self, name, value):
+        self.changes.append((name, value))
+        object.__setattr__(self, name, value)
+
+
+def test_prices_sheet_update_suspends_and_restores_excel_recalculation():
+    """La escritura masiva suspende repintado y cálculo, y restaura los valores previos."""
+    sheet = FakeSheet()
+    workbook = FakeWorkbook(sheet)
+    workbook.app = FakeApp()
+    ops = SheetOperations(workbook)
+
+    assert ops.update_market_data_to_prices_sheet(_securities_df(), 'HomeBroker')
+
+    assert workbook.app.changes[:2] == [('screen_updating', False), ('calculation', 'manual')]
+    assert workbook.app.screen_updating is True
+    assert workbook.app.calculation == 'semiautomatic'
+
+
+def test_prices_sheet_uses_raw_com_writes_on_windows(monkeypatch):
+    """En Windows el bloque se asigna por raw_value como listas de valores de Python."""
+    monkeypatch.setattr(sheet_operations, '_RAW_COM_WRITES', True)
+    sheet = FakeSheet()
+    ops = SheetOperations(FakeWorkbook(sheet))
+    df = _securities_df()
+    df['datetime'] = [pd.Timestamp('2025-01-02 10:00'), pd.NaT]
+
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+
+    assert not [address for address, _ in sheet.writes if address == 'B2:O3']
+    address, bulk = sheet.raw_writes[-1]
+    assert address == 'B2:O3'
+    assert bulk[0][:5] == [10, 100.0, 101.0, 11, 100.5]
+    # Marcado como UTC para que pywin32 no lo corra por el desfase horario local
+    assert bulk[0][13] == datetime(2025, 1, 2, 10, 0, tzinfo=timezone.utc)
+    assert bulk[0][13].tzinfo is timezone.utc
+    assert bulk[1][13] is None
+
+
+def test_symbol_row_cache_reads_column_a_up_to_used_range():
+    """El caché de filas lee la columna A hasta el final del rango usado, sin tope de 1000 filas."""
+    sheet = FakeSheet()
+    symbols = [f'S{i:04d} - 24hs' for i in range(1200)]
+    sheet.cells['A2:A1201'] = symbols
+    ops = SheetOperations(FakeWorkbook(sheet))
+    df = pd.DataFrame({'bid': [1.0], 'ask': [2.0], 'last': [1.5]},
+                      index=pd.Index(['MERV - XMEV - S1199 - 24hs'], name='symbol'))
+
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+
+    assert 'A2:A1000' not in sheet.range_calls
+    assert ops._symbol_row_cache['MERV - XMEV - S1199 - 24hs'] == 1201
+    assert sheet.writes[-1][0] == 'B1201:O1201'
+
+
+def test_symbol_row_cache_is_only_rebuilt_after_invalidation():
+    """La columna A se lee una sola vez hasta que se invalida el caché explícitamente."""
+    sheet = FakeSheet()
+    sheet.cells['A2:A3'] = ['GGAL - 24hs', 'YPFD - 24hs']
+    ops = SheetOperations(FakeWorkbook(sheet))
+    df = _securities_df()
+
+    def column_a_reads():
+        return sum(1 for address in sheet.range_calls if address.startswith('A2:A'))
+
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert column_a_reads() == 1
+
+    ops.reset_stats()
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert column_a_reads() == 1
+
+    ops.invalidate_symbol_cache()
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert column_a_reads() == 2
+
+
+def test_headers_are_probed_with_one_cell_once_per_sheet():
+    """Los encabezados se verifican leyendo sólo A1 y una única vez por hoja."""
+    sheet = FakeSheet()
+    ops = SheetOperations(FakeWorkbook(sheet))
+
+    ops._ensure_headers_exist(sheet)
+    ops._ensure_headers_exist(sheet)
+
+    assert sheet.range_calls.count('A1') == 1
+    assert sheet.cells['A1:O1'][0] == 'symbol'
+
+    ops.invalidate_symbol_cache()
+    ops._ensure_headers_exist(sheet)
+    assert sheet.range_calls.count('A1') == 2
+
+
+def test_failed_prices_update_drops_cached_handles():
+    """Tras una escritura fallida se descartan la hoja y los rangos cacheados."""
+    sheet = FakeSheet()
+    workbook = FakeWorkbook(sheet)
+    ops = SheetOperations(workbook)
+    df = _securities_df()
+
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert ops._sheet_cache
+
+    sheet.writes = None  # La próxima escritura falla
+    df['bid'] += 1.0
+    assert not ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert not ops._sheet_cache and not ops._range_cache
+
+    sheet.writes = []
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert workbook.sheet_calls == 2
+
+
+def test_duplicated_symbols_do_not_rewrite_their_row_every_flush():
+    """Un símbolo repetido en el DataFrame se escribe una vez y no se reescribe sin cambios."""
+    sheet = FakeSheet()
+    ops = SheetOperations(FakeWorkbook(sheet))
+    df = pd.concat([_securities_df(), _securities_df().iloc[:1] * 0])  # GGAL dos veces, la última en cero
+    df.iloc[0, df.columns.get_loc('last')] = 100.0
+
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    data_writes = [address for address, _ in sheet.writes if address[0] != 'A']
+    assert data_writes == ['B2:O3']
+
+    assert ops.update_market_data_to_prices_sheet(df, 'HomeBroker')
+    assert [address for address, _ in sheet.writes if address[0] != 'A'] == data_writes
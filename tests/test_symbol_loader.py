@@ -0,0 +1,120 @@
+"""
+Tests para la carga de símbolos desde la hoja Tickers.
+"""
+
+from epgb_options.excel.symbol_loader import SymbolLoader
+from epgb_options.utils.helpers import transform_symbol_for_pyrofex
+
+
+class FakeRange:
+    """Rango mínimo compatible con la API de xlwings usada por SymbolLoader."""
+
+    def __init__(self, value):
+        self.value = value
+
+    def options(self, **kwargs):
+        return self
+
+
+class FakeSheet:
+    """Hoja falsa que registra cada acceso a rangos."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.range_calls = []
+
+    def range(self, address):
+        self.range_calls.append(address)
+        return FakeRange(self.rows)
+
+
+def _build_rows():
+    # Columnas A-M: opciones en A, acciones en C, bonos en E, el resto vacío
+    rows = [[None] * 13 for _ in range(5)]
+    rows[0][0] = 'GFGC38566O'
+    rows[1][0] = 'GFGV38566O'
+    rows[0][2] = 'GGAL'
+    rows[1][2] = 'YPFD - spot'
+    rows[2][2] = 'ALUA'
+    rows[4][2] = 'PAMP'  # Después de un hueco: expand() no lo incluye
+    rows[0][4] = 'AL30 - 48hs'
+    return rows
+
+
+def test_all_lists_share_a_single_excel_read():
+    """Todas las listas se cargan con una única lectura del rango de tickers."""
+    sheet = FakeSheet(_build_rows())
+    loader = SymbolLoader(sheet)
+
+    all_symbols = loader.get_all_symbols()
+
+    assert sheet.range_calls == [SymbolLoader.TICKERS_RANGE]
+    assert list(all_symbols['options'].index) == [
+        'MERV - XMEV - GFGC38566O - 24hs', 'MERV - XMEV - GFGV38566O - 24hs'
+    ]
+    assert list(all_symbols['acciones'].index) == [
+        'MERV - XMEV - GGAL - 24hs', 'MERV - XMEV - YPFD - CI', 'MERV - XMEV - ALUA - 24hs'
+    ]
+    assert list(all_symbols['bonos'].index) == ['MERV - XMEV - AL30 - 48hs']
+    assert all_symbols['cedears'].empty
+
+
+def test_market_data_frames_are_built_with_final_dtypes():
+    """Los DataFrames se crean indexados por símbolo y con los tipos finales."""
+    loader = SymbolLoader(FakeSheet(_build_rows()))
+
+    options_df = loader.get_options_list()
+    cauciones_df = loader.get_cauciones_list()
+
+    assert options_df.index.name == 'symbol'
+    assert list(options_df.columns) == list(SymbolLoader.OPTIONS_COLUMNS)
+    assert list(cauciones_df.columns) == list(SymbolLoader.SECURITIES_COLUMNS)
+    assert str(cauciones_df['bid'].dtype) == 'float64'
+    assert str(cauciones_df['bid_size'].dtype) == 'int64'
+    assert str(cauciones_df['datetime'].dtype) == 'datetime64[ns]'
+    assert (cauciones_df['last'] == 0.0).all()
+
+
+def test_allocate_securities_frame_builds_one_frame_in_order():
+    """El DataFrame de títulos se asigna una sola vez, en el orden de los símbolos."""
+    loader = SymbolLoader(FakeSheet(_build_rows()))
+    symbols = [
+        symbol for df in (loader.get_acciones_list(), loader.get_cedears_list(), loader.get_bonos_list())
+        for symbol in df.index
+    ]
+
+    combined = loader.allocate_securities_frame(symbols)
+
+    assert list(combined.index) == [
+        'MERV - XMEV - GGAL - 24hs', 'MERV - XMEV - YPFD - CI',
+        'MERV - XMEV - ALUA - 24hs', 'MERV - XMEV - AL30 - 48hs'
+    ]
+    assert list(combined.columns) == list(SymbolLoader.SECURITIES_COLUMNS)
+    assert (combined['last'] == 0.0).all()
+    assert loader.allocate_securities_frame([]).empty
+
+
+def test_symbols_listed_twice_get_a_single_row():
+    """Un ticker listado en dos columnas de Tickers aparece una sola vez en el DataFrame."""
+    rows = _build_rows()
+    rows[1][4] = 'GGAL'  # También en la columna de bonos
+    loader = SymbolLoader(FakeSheet(rows))
+    symbols = [
+        symbol for df in (loader.get_acciones_list(), loader.get_bonos_list())
+        for symbol in df.index
+    ]
+
+    combined = loader.allocate_securities_frame(symbols)
+
+    assert combined.index.is_unique
+    assert list(combined.index) == [
+        'MERV - XMEV - GGAL - 24hs', 'MERV - XMEV - YPFD - CI',
+        'MERV - XMEV - ALUA - 24hs', 'MERV - XMEV - AL30 - 48hs'
+    ]
+
+
+def test_already_prefixed_symbols_are_not_prefixed_again():
+    """Los símbolos ya prefijados sólo convierten el sufijo spot a CI."""
+    assert transform_symbol_for_pyrofex('MERV - XMEV - GGAL - 24hs') == 'MERV - XMEV - GGAL - 24hs'
+    assert transform_symbol_for_pyrofex('MERV - XMEV - GGAL - spot') == 'MERV - XMEV - GGAL - CI'
+    assert transform_symbol_for_pyrofex(' GGAL - spot ') == 'MERV - XMEV - GGAL - CI'